@@ -2,7 +2,20 @@
 
 import os
 
+import orjson
 from celery import Celery, Task
+from celery.signals import worker_process_init, worker_process_shutdown
+from kombu.serialization import register
+
+# Task/result payloads are encoded with orjson; "json" stays accepted so
+# messages queued before the switch still decode.
+register(
+    "orjson",
+    lambda obj: orjson.dumps(obj).decode(),
+    orjson.loads,
+    content_type="application/x-orjson",
+    content_encoding="utf-8",
+)
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "Jadwak.settings.dev")
 
@@ -13,6 +26,22 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 
 
+@worker_process_init.connect
+def start_worker_log_listener(**kwargs: object) -> None:
+    """Make sure the pool process runs its own log QueueListener thread."""
+    from Jadwak.logging_utils import start_queue_listener
+
+    start_queue_listener()
+
+
+@worker_process_shutdown.connect
+def stop_worker_log_listener(**kwargs: object) -> None:
+    """Write out queued log records; pool processes exit without atexit hooks."""
+    from Jadwak.logging_utils import stop_queue_listener
+
+    stop_queue_listener()
+
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self: Task) -> None:
     """Print the request information for debugging purposes."""
@@ -0,0 +1,28 @@
+"""HTTP helpers for the Jadwak project."""
+
+import functools
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import requests
+
+
+@functools.lru_cache(maxsize=None)
+def pooled_session() -> "requests.Session":
+    """Return this process's pooled HTTP session, importing requests lazily.
+
+    Created on first use, i.e. after the prefork worker has forked, so each
+    process gets its own connection pool, kept alive across tasks. Celery owns
+    retries (with backoff), so the adapter itself never retries.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32, pool_maxsize=32, max_retries=Retry(total=0)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
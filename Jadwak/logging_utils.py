@@ -0,0 +1,87 @@
+"""Logging helpers for the Jadwak project."""
+
+import atexit
+import functools
+import logging
+import os
+import queue
+from logging.handlers import MemoryHandler, RotatingFileHandler
+from typing import TextIO
+
+# PID of the process whose listener thread is running, per QueueHandler name
+_listener_pids: dict[str, int] = {}
+
+
+class FastRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that tracks the file size instead of re-measuring it.
+
+    The stock handler formats every record twice (once to size it for the
+    rollover check, once to write it) and stats the log file on each emit.
+    Here the size is read once when the stream is opened and then advanced as
+    records are formatted, so rollover is decided without extra work. The file
+    may overshoot maxBytes by at most one record.
+    """
+
+    def _open(self: "FastRotatingFileHandler") -> TextIO:
+        """Open the stream and seed the byte counter from its current size."""
+        stream = super()._open()
+        self._bytes_written = stream.tell()
+        return stream
+
+    def shouldRollover(
+        self: "FastRotatingFileHandler", record: logging.LogRecord
+    ) -> bool:
+        """Return True once the tracked size has reached maxBytes."""
+        if self.stream is None:
+            self.stream = self._open()
+        return 0 < self.maxBytes <= self._bytes_written
+
+    def format(self: "FastRotatingFileHandler", record: logging.LogRecord) -> str:
+        """Format the record and account for its length in the byte counter."""
+        msg = super().format(record)
+        self._bytes_written += len(msg) + len(self.terminator)
+        return msg
+
+
+def start_queue_listener(handler_name: str = "queue") -> None:
+    """Start the QueueListener behind the named QueueHandler, if one is configured.
+
+    dictConfig builds the listener for a QueueHandler but leaves it stopped, so
+    records would pile up in the queue without ever reaching console/file.
+    The listener thread does not survive a fork, so it is started again in
+    every child (Celery prefork workers, preloading WSGI servers).
+    """
+    handler = logging.getHandlerByName(handler_name)
+    listener = getattr(handler, "listener", None)
+    if listener is None or _listener_pids.get(handler_name) == os.getpid():
+        return
+    if handler_name in _listener_pids:
+        # Forked child: the parent's thread is gone, and the inherited queue
+        # holds the parent's records (or a lock taken mid-put), so start over
+        handler.queue = listener.queue = queue.Queue()
+        listener._thread = None
+        # Buffered records are the parent's too; flushing them here would
+        # write them once more per child
+        for target in listener.handlers:
+            if isinstance(target, MemoryHandler):
+                with target.lock:
+                    target.buffer.clear()
+    else:
+        atexit.register(stop_queue_listener, handler_name)
+        os.register_at_fork(
+            after_in_child=functools.partial(start_queue_listener, handler_name)
+        )
+    listener.start()
+    _listener_pids[handler_name] = os.getpid()
+
+
+def stop_queue_listener(handler_name: str = "queue") -> None:
+    """Stop this process's QueueListener, writing out the records still queued."""
+    handler = logging.getHandlerByName(handler_name)
+    listener = getattr(handler, "listener", None)
+    if (
+        listener is not None
+        and listener._thread is not None
+        and _listener_pids.get(handler_name) == os.getpid()
+    ):
+        listener.stop()
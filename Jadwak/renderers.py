@@ -0,0 +1,34 @@
+"""REST framework renderers for the Jadwak project."""
+
+from typing import Any, Optional
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes responses with orjson.
+
+    Values orjson cannot encode natively (Decimal, lazy strings, ...) fall back
+    to REST framework's JSONEncoder. Requests asking for indented output are
+    left to the stock renderer.
+    """
+
+    def render(
+        self: "ORJSONRenderer",
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[dict] = None,
+    ) -> bytes:
+        """Render data into compact JSON bytes."""
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Validation errors of list fields are keyed by int index
+        return orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS,
+        )
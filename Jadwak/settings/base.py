@@ -66,6 +66,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Compress responses (GeoJSON shrinks ~4x); sets Vary: Accept-Encoding
+    "django.middleware.gzip.GZipMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -156,15 +158,30 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Shared by the web and worker processes: the change detection coalescing
+# marker, the detections GeoJSON cache the workers invalidate and the AI
+# circuit breaker all rely on every process seeing the same cache
+CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": env("REDIS_CACHE_URL", default="redis://redis:6379/2"),
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+        },
+    }
+}
+
 
 CELERY_BROKER_URL = env("CELERY_BROKER_URL", default="redis://redis:6379/0")
 CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND", default="redis://redis:6379/0")
 CELERY_RESULT_EXTENDED = True
+# Keep broker connections alive between publishes instead of reconnecting
+CELERY_BROKER_TRANSPORT_OPTIONS = {"socket_keepalive": True}
 CELERY_RESULT_BACKEND = "django-db"  # Store results in the database
 
-CELERY_ACCEPT_CONTENT = ["json"]
-CELERY_TASK_SERIALIZER = "json"
-CELERY_RESULT_SERIALIZER = "json"
+CELERY_ACCEPT_CONTENT = ["orjson", "json"]
+CELERY_TASK_SERIALIZER = "orjson"  # registered in Jadwak/celery.py
+CELERY_RESULT_SERIALIZER = "orjson"
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
@@ -181,6 +198,13 @@ CELERY_TASK_DEFAULT_QUEUE = "default"
 CELERY_TASK_DEFAULT_EXCHANGE = "default"
 CELERY_TASK_DEFAULT_ROUTING_KEY = "default"
 
+# AI inference runs on its own queue, so the concurrency of the worker
+# consuming it (celery_ai_worker) bounds the calls in flight to the service
+CELERY_TASK_ROUTES = {
+    "detection.tasks.process_image_detections": {"queue": "ai_inference"},
+    "detection.tasks.process_image_detections_batch": {"queue": "ai_inference"},
+}
+
 
 # Django REST Framework settings (basic configuration)
 REST_FRAMEWORK = {
@@ -198,7 +222,7 @@ REST_FRAMEWORK = {
     ),
     # Optional: Configure renderer for nice browsable API and JSON
     "DEFAULT_RENDERER_CLASSES": (
-        "rest_framework.renderers.JSONRenderer",
+        "Jadwak.renderers.ORJSONRenderer",
         "rest_framework.renderers.BrowsableAPIRenderer",
     ),
 }
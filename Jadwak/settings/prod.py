@@ -1,5 +1,6 @@
 """production environ settings."""
 
+import logging
 import os
 
 from .base import BASE_DIR, env
@@ -47,6 +48,9 @@ CORS_ALLOWED_ORIGINS = env.list(
 # AWS_STORAGE_BUCKET_NAME = env('AWS_STORAGE_BUCKET_NAME')
 # AWS_S3_REGION_NAME = env('AWS_S3_REGION_NAME', default='us-east-1')
 # AWS_S3_CUSTOM_DOMAIN = env('AWS_S3_CUSTOM_DOMAIN', default=f'{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com') # Optional
+# Serve unsigned URLs from a public-read prefix so FileField.url is a plain string
+# join instead of one presign per object (e.g. every layer in /sites/{id}/gis_layers/)
+# AWS_QUERYSTRING_AUTH = env.bool('AWS_QUERYSTRING_AUTH', default=False)
 
 # Logging (configure for production monitoring)
 LOGGING = {
@@ -58,12 +62,30 @@ LOGGING = {
         },
         "file": {
             "level": "INFO",
-            "class": "logging.handlers.RotatingFileHandler",
+            "class": "Jadwak.logging_utils.FastRotatingFileHandler",
             "filename": os.path.join(BASE_DIR, "logs/jadwak.log"),
             "maxBytes": 1024 * 1024 * 5,  # 5 MB
             "backupCount": 5,
             "formatter": "verbose",
         },
+        # Buffers file records in RAM and writes them in small batches; WARNING
+        # and above flush immediately, and logging.shutdown() flushes on exit.
+        # The buffer is kept small so a quiet process's file does not lag far
+        # behind, and a killed one loses little.
+        "memory": {
+            "class": "logging.handlers.MemoryHandler",
+            "capacity": 64,
+            "flushLevel": logging.WARNING,
+            "target": "file",
+        },
+        # Request threads only enqueue records; a QueueListener started in
+        # CoreConfig.ready() (and again in every forked worker process) does
+        # the console/file I/O on a background thread.
+        "queue": {
+            "class": "logging.handlers.QueueHandler",
+            "handlers": ["console", "memory"],
+            "respect_handler_level": True,
+        },
         # Add Sentry, CloudWatch, etc., handlers here
     },
     "formatters": {
@@ -74,12 +96,28 @@ LOGGING = {
     },
     "loggers": {
         "django": {
-            "handlers": ["console", "file"],
+            "handlers": ["queue"],
             "level": "INFO",
             "propagate": True,
         },
         "jadwak": {  # Your project-specific logger
-            "handlers": ["console", "file"],
+            "handlers": ["queue"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        # Module loggers of the project apps (getLogger(__name__))
+        "core": {
+            "handlers": ["queue"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "detection": {
+            "handlers": ["queue"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "alerts": {
+            "handlers": ["queue"],
             "level": "INFO",
             "propagate": False,
         },
@@ -103,3 +141,18 @@ CELERY_BROKER_URL = env(
 CELERY_RESULT_BACKEND = env(
     "CELERY_RESULT_BACKEND_PROD", default="redis://your_prod_redis_host:6379/1"
 )
+
+# Shared cache across web/worker processes (django-redis), on its own Redis DB
+CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": env(
+            "REDIS_CACHE_URL_PROD", default="redis://your_prod_redis_host:6379/2"
+        ),
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "COMPRESSOR": "django_redis.compressors.zlib.ZlibCompressor",
+        },
+    }
+}
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
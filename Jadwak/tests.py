@@ -0,0 +1,77 @@
+"""tests module for the Jadwak project package."""
+
+import logging
+import os
+import queue
+import sys
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
+from pathlib import Path
+
+import orjson
+import pytest
+from rest_framework import serializers
+
+from Jadwak.logging_utils import start_queue_listener, stop_queue_listener
+from Jadwak.renderers import ORJSONRenderer
+
+
+def test_orjson_renderer_renders_list_field_errors() -> None:
+    """Render ListField validation errors, which are keyed by int index."""
+
+    class IdsSerializer(serializers.Serializer):
+        """Serializer with a list of integers."""
+
+        ids = serializers.ListField(child=serializers.IntegerField())
+
+    serializer = IdsSerializer(data={"ids": [1, "abc"]})
+    assert not serializer.is_valid()
+
+    rendered = orjson.loads(ORJSONRenderer().render(serializer.errors))
+
+    assert list(rendered) == ["ids"]
+    assert list(rendered["ids"]) == ["1"]
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "fork") or sys.version_info < (3, 12),
+    reason="needs os.fork and logging.getHandlerByName",
+)
+def test_queue_listener_writes_records_logged_in_forked_child(tmp_path: Path) -> None:
+    """A record logged in a forked child is written, the parent's buffer is not."""
+    log_file = tmp_path / "child.log"
+    target = logging.FileHandler(log_file)
+    memory = MemoryHandler(capacity=64, target=target)
+    handler = QueueHandler(queue.Queue())
+    handler.listener = QueueListener(handler.queue, memory)
+    handler.name = "test_fork_queue"
+    logger = logging.getLogger("jadwak.tests.fork")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    start_queue_listener("test_fork_queue")
+    try:
+        # Sits in the parent's memory buffer when the child is forked
+        memory.handle(
+            logger.makeRecord(logger.name, logging.INFO, "", 0, "parent", (), None)
+        )
+        pid = os.fork()
+        if pid == 0:
+            # os._exit skips atexit, so the child drains its queue explicitly
+            try:
+                logger.info("logged in child %s", os.getpid())
+                stop_queue_listener("test_fork_queue")
+                memory.flush()
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        child_output = log_file.read_text()
+    finally:
+        stop_queue_listener("test_fork_queue")
+        logger.removeHandler(handler)
+        memory.close()
+        target.close()
+
+    assert f"logged in child {pid}" in child_output
+    # The parent's buffered record is not written again by the child
+    assert "parent" not in child_output
@@ -37,6 +37,8 @@ class Alert(models.Model):
         Site,
         on_delete=models.CASCADE,
         related_name="alerts",
+        # alert_site_status_trig_idx leads with site and serves FK lookups
+        db_index=False,
         help_text="The site where the alert was triggered",
     )
 
@@ -86,6 +88,13 @@ class Alert(models.Model):
         verbose_name = "Alert"
         verbose_name_plural = "Alerts"
         ordering = ["-triggered_on"]
+        indexes = [
+            # Serves the per-site, status-filtered alert list in its default order
+            models.Index(
+                fields=["site", "status", "-triggered_on"],
+                name="alert_site_status_trig_idx",
+            ),
+        ]
 
     def __str__(self: "Alert") -> str:
         """Return string representation of the Alert model."""
@@ -1,78 +1,114 @@
 """Contains celery tasks for generating and sending alerts."""
 
-import json
-import requests
-
+import logging
+import string
 from typing import List
 
+import orjson
 from celery import shared_task
 from celery.app.task import Task  # Import Task for type hinting 'self'
 from django.conf import settings
 from django.core.mail import send_mail
 from django.db import transaction
 from django.shortcuts import get_object_or_404
-from django.utils.html import strip_tags
 
 from alerts.models import Alert
 from detection.models import ChangeLog
-
-from django.contrib.auth import get_user_model
-
-User = get_user_model()
-
-
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+from Jadwak.http import pooled_session
+
+logger = logging.getLogger(__name__)
+
+_MOCK_WEBHOOK_URL = "http://mock-webhook-receiver.com/alert"
+
+
+# Email templates are parsed once at import; the plain-text body is composed
+# directly rather than derived from the HTML with strip_tags.
+_ALERT_ADMIN_URL = "http://localhost:8001/admin/alerts/alert/{pk}/change/"
+_EMAIL_SUBJECT = string.Template("Jenga Alert: $type on $site")
+_EMAIL_HTML = string.Template(
+    "<p><strong>Jenga Platform Alert!</strong></p>"
+    "<p><strong>Site:</strong> $site</p>"
+    "<p><strong>Type:</strong> $type</p>"
+    "<p><strong>Description:</strong> $description</p>"
+    "<p><strong>Triggered On:</strong> $triggered_on</p>"
+    '<p>View on Jenga dashboard: <a href="$url">View Alert (Dev Admin)</a></p>'
+    "<p>Best regards,<br>The Jenga Team</p>"
+)
+_EMAIL_TEXT = string.Template(
+    "Jenga Platform Alert!\n\n"
+    "Site: $site\n"
+    "Type: $type\n"
+    "Description: $description\n"
+    "Triggered On: $triggered_on\n"
+    "View on Jenga dashboard: $url\n\n"
+    "Best regards,\nThe Jenga Team\n"
+)
+
+# ChangeLog.change_type -> (Alert.type, description template)
+_CHANGE_TYPE_ALERTS = {
+    "NEW_DETECTIONS": (
+        "NEW_EQUIPMENT_DETECTED",
+        "New equipment detected on site {site}: {description}",
+    ),
+    "REMOVED_DETECTIONS": (
+        "EQUIPMENT_MISSING",
+        "Equipment removed from site {site}: {description}",
+    ),
+    "SITE_ACTIVITY_HIGH": (
+        "SITE_ACTIVITY_HIGH",
+        "High activity detected on site {site}: {description}",
+    ),
+    "SITE_ACTIVITY_LOW": (
+        "SITE_ACTIVITY_LOW",
+        "Low activity detected on site {site}: {description}",
+    ),
+    "COUNT_CHANGED": (
+        "COUNT_THRESHOLD_EXCEEDED",
+        "Detection count changed on site {site}: {description}",
+    ),
+}
+
+
+# Nothing reads its return value, so no result row is written per change log
+@shared_task(bind=True, max_retries=3, default_retry_delay=60, ignore_result=True)
 def generate_alerts(self: Task, change_log_id: int) -> str:
     """Celery task to generate alerts based on a ChangeLog entry."""
     try:
-        change_log = get_object_or_404(ChangeLog, id=change_log_id)
+        # Load only what the alert needs; the owner is linked by id, not fetched
+        change_log = (
+            ChangeLog.objects.select_related("site")
+            .only(
+                "change_type",
+                "description",
+                "metadata",
+                "site__name",
+                "site__owner",
+            )
+            .get(id=change_log_id)
+        )
         site = change_log.site
 
-        print(
-            f"Generating alerts for ChangeLog {change_log.pk} on Site: {site.name} "
-            f"(Type: {change_log.change_type})."
+        logger.info(
+            "Generating alerts for ChangeLog %s on Site: %s (Type: %s).",
+            change_log.pk,
+            site.name,
+            change_log.change_type,
         )
 
         # --- SIMPLIFIED / HARDCODED ALERT RULE APPLICATION ---
         # In a real scenario, you would query AlertRule.objects.filter(site=site, is_active=True)
         # and evaluate each rule against the change_log's data.
-        # For now, we'll use direct if/else based on change_type.
+        # For now, we map change_type straight to an alert type and description.
 
-        alert_type = "OTHER"
-        description = change_log.description
-        trigger_alert = True
+        # Don't create an alert for 'NO_CHANGE' or unhandled types
+        mapping = _CHANGE_TYPE_ALERTS.get(change_log.change_type)
 
-        if change_log.change_type == "NEW_DETECTIONS":
-            alert_type = "NEW_EQUIPMENT_DETECTED"
-            description = (
-                f"New equipment detected on site {site.name}: {change_log.description}"
-            )
-        elif change_log.change_type == "REMOVED_DETECTIONS":
-            alert_type = "EQUIPMENT_MISSING"
-            description = (
-                f"Equipment removed from site {site.name}: {change_log.description}"
-            )
-        elif change_log.change_type == "SITE_ACTIVITY_HIGH":
-            alert_type = "SITE_ACTIVITY_HIGH"
-            description = (
-                f"High activity detected on site {site.name}: {change_log.description}"
-            )
-        elif change_log.change_type == "SITE_ACTIVITY_LOW":
-            alert_type = "SITE_ACTIVITY_LOW"
-            description = (
-                f"Low activity detected on site {site.name}: {change_log.description}"
-            )
-        elif change_log.change_type == "COUNT_CHANGED":
-            alert_type = "COUNT_THRESHOLD_EXCEEDED"
-            description = (
-                f"Detection count changed on site {site.name}: {change_log.description}"
-            )
-        else:
-            trigger_alert = (
-                False  # Don't create an alert for 'NO_CHANGE' or unhandled types
+        if mapping is not None:
+            alert_type, description_template = mapping
+            description = description_template.format(
+                site=site.name, description=change_log.description
             )
 
-        if trigger_alert:
             # Create Alert instance
             with transaction.atomic():
                 # For simplicity, link to the site's owner for now.
@@ -80,38 +116,48 @@ def generate_alerts(self: Task, change_log_id: int) -> str:
                 alert = Alert.objects.create(
                     type=alert_type,
                     site=site,
-                    user=site.owner,  # Link to site owner as the recipient for now
+                    user_id=site.owner_id,  # Link to site owner as the recipient for now
                     change_log=change_log,
                     description=description,
                     metadata=change_log.metadata,  # Pass change_log metadata to alert
                 )
-                print(f"Created Alert {alert.pk} for site {site.name}: '{description}'")
+                logger.info(
+                    "Created Alert %s for site %s: '%s'",
+                    alert.pk,
+                    site.name,
+                    description,
+                )
 
-                # Trigger notification tasks
-                send_email_alert.delay(alert.pk)
-                send_webhook_alert.delay(alert.pk)
+                # Trigger notification tasks once the alert row is committed,
+                # so workers never look it up before it is visible.
+                transaction.on_commit(
+                    lambda alert_id=alert.pk: send_email_alert.delay(alert_id)
+                )
+                transaction.on_commit(
+                    lambda alert_id=alert.pk: send_webhook_alert.delay(alert_id)
+                )
 
             return (
                 f"Alert generated for ChangeLog {change_log.pk} "
                 f"(Type: {alert_type}). Notifications triggered."
             )
         else:
-            print(
-                "No alert generated for ChangeLog "
-                f"{change_log.pk} based on current rules."  # Fixed F541
+            logger.info(
+                "No alert generated for ChangeLog %s based on current rules.",
+                change_log.pk,
             )
             return f"No alert for ChangeLog {change_log.pk}."
 
     except ChangeLog.DoesNotExist:
-        print(
-            f"Error: ChangeLog with ID {change_log_id} does not exist. "
-            "Aborting alert generation task."
+        logger.error(
+            "ChangeLog with ID %s does not exist. Aborting alert generation task.",
+            change_log_id,
         )
         raise
     except Exception as e:
-        print(
-            f"An unexpected error occurred during alert generation for ChangeLog "
-            f"{change_log_id}: {e}"
+        logger.exception(
+            "An unexpected error occurred during alert generation for ChangeLog %s",
+            change_log_id,
         )
         self.retry(exc=e)
 
@@ -129,29 +175,27 @@ def send_email_alert(self: Task, alert_id: int) -> str:
             recipient_list.append(alert.site.owner.email)
 
         if not recipient_list:
-            print(f"No email recipients for alert {alert.pk}.")
+            logger.info("No email recipients for alert %s.", alert.pk)
             return f"No email recipients for alert {alert.pk}."
 
-        subject = f"Jenga Alert: {alert.get_type_display()} on {alert.site.name}"
-        message = alert.description
-        html_message = (
-            f"<p><strong>Jenga Platform Alert!</strong></p>"
-            f"<p><strong>Site:</strong> {alert.site.name}</p>"
-            f"<p><strong>Type:</strong> {alert.get_type_display()}</p>"
-            f"<p><strong>Description:</strong> {message}</p>"
-            f"<p><strong>Triggered On:</strong> {alert.triggered_on.strftime('%Y-%m-%d %H:%M:%S UTC')}</p>"
-            f'<p>View on Jenga dashboard: <a href="http://localhost:8001/admin/alerts/alert/{alert.pk}/change/">'
-            "View Alert (Dev Admin)</a></p>"  # Line break for E501
-            "<p>Best regards,<br>The Jenga Team</p>"
+        fields = {
+            "site": alert.site.name,
+            "type": alert.get_type_display(),
+            "description": alert.description,
+            "triggered_on": alert.triggered_on.strftime("%Y-%m-%d %H:%M:%S UTC"),
+            "url": _ALERT_ADMIN_URL.format(pk=alert.pk),
+        }
+        subject = _EMAIL_SUBJECT.substitute(fields)
+        html_message = _EMAIL_HTML.substitute(fields)
+        plain_message = _EMAIL_TEXT.substitute(fields)
+
+        # Mock email sending for now (logged)
+        logger.info(
+            "MOCK EMAIL ALERT\nTo: %s\nSubject: %s\nBody (HTML): %s",
+            ", ".join(recipient_list),
+            subject,
+            html_message,
         )
-        plain_message = strip_tags(html_message)
-
-        # Mock email sending for now (print to console)
-        print("\n--- MOCK EMAIL ALERT ---")  # Fixed F541
-        print(f"To: {', '.join(recipient_list)}")
-        print(f"Subject: {subject}")
-        print(f"Body (HTML): {html_message}")
-        print("--- END MOCK EMAIL ALERT ---\n")  # Fixed F541
 
         # In a real scenario, you'd use Django's send_mail:
         send_mail(
@@ -166,23 +210,27 @@ def send_email_alert(self: Task, alert_id: int) -> str:
         return f"Mock email sent for Alert {alert.pk} to {recipient_list}."
 
     except Alert.DoesNotExist:
-        print(f"Error: Alert with ID {alert_id} does not exist for email notification.")
+        logger.error(
+            "Alert with ID %s does not exist for email notification.", alert_id
+        )
         raise
     except Exception as e:
-        print(f"An unexpected error occurred sending email for Alert {alert_id}: {e}")
+        logger.exception(
+            "An unexpected error occurred sending email for Alert %s", alert_id
+        )
         self.retry(exc=e)
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=300)
 def send_webhook_alert(self: Task, alert_id: int) -> str:
     """Celery task to send a webhook notification for a triggered alert."""
+    from requests.exceptions import RequestException
+
     try:
         alert = get_object_or_404(Alert, id=alert_id)
 
-        # --- MOCK WEBHOOK URL ---
         # In a real scenario, this would come from AlertRule config or Integration settings
-        webhook_url = "http://mock-webhook-receiver.com/alert"
-        # ------------------------
+        webhook_url = getattr(settings, "ALERT_WEBHOOK_URL", None)
 
         payload = {
             "alert_id": alert.pk,
@@ -190,34 +238,48 @@ def send_webhook_alert(self: Task, alert_id: int) -> str:
             "site_id": alert.site.id,
             "site_name": alert.site.name,
             "description": alert.description,
-            "timestamp": alert.triggered_on.isoformat(),
+            "timestamp": alert.triggered_on,  # orjson emits ISO 8601 natively
             "status": alert.status,
             "metadata": alert.metadata,
         }
 
-        # Mock webhook sending for now (print to console)
-        print("\n--- MOCK WEBHOOK ALERT ---")  # Fixed F541
-        print(f"To: {webhook_url}")
-        print(f"Payload: {json.dumps(payload, indent=2)}")
-        print("--- END MOCK WEBHOOK ALERT ---\n")  # Fixed F541
-
-        # In a real scenario, you'd use requests:
-        # response = requests.post(webhook_url, json=payload, timeout=10)
-        # response.raise_for_status() # Raise an exception for HTTP errors
-        # print(f"Webhook sent successfully for Alert {alert.pk}. Response: {response.status_code}")
+        if not webhook_url:
+            # Mock webhook sending when no receiver is configured (logged); the
+            # payload is only dumped when the record will be emitted
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "MOCK WEBHOOK ALERT\nTo: %s\nPayload: %s",
+                    _MOCK_WEBHOOK_URL,
+                    orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode(),
+                )
+            return f"Mock webhook sent for Alert {alert.pk}."
 
-        return f"Mock webhook sent for Alert {alert.pk}."
+        response = pooled_session().post(
+            webhook_url,
+            data=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=(3, 10),
+        )
+        response.raise_for_status()  # Raise an exception for HTTP errors
+        logger.info(
+            "Webhook sent successfully for Alert %s. Response: %s",
+            alert.pk,
+            response.status_code,
+        )
+        return f"Webhook sent for Alert {alert.pk}."
 
     except Alert.DoesNotExist:
-        print(
-            f"Error: Alert with ID {alert_id} does not exist for webhook notification."
+        logger.error(
+            "Alert with ID %s does not exist for webhook notification.", alert_id
         )
         raise
-    except (
-        requests.exceptions.RequestException
-    ) as e:  # Catch network/HTTP errors for real requests
-        print(f"Network/HTTP error sending webhook for Alert {alert_id}: {e}")
+    except RequestException as e:  # Catch network/HTTP errors for real requests
+        logger.warning(
+            "Network/HTTP error sending webhook for Alert %s: %s", alert_id, e
+        )
         self.retry(exc=e)  # Retry for network errors
     except Exception as e:
-        print(f"An unexpected error occurred sending webhook for Alert {alert_id}: {e}")
+        logger.exception(
+            "An unexpected error occurred sending webhook for Alert %s", alert_id
+        )
         self.retry(exc=e)
@@ -1,17 +1,54 @@
 """admin module for core app."""
 
+from typing import Any, Optional
+
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.gis import admin
+from django.db.models import QuerySet
+from django.http import HttpRequest
 
 from .models import GISLayer, SatelliteImage, Site
 
 
+class DeferringChangeList(ChangeList):
+    """ChangeList that skips loading the model admin's changelist_defer fields."""
+
+    def get_queryset(
+        self: "DeferringChangeList",
+        request: HttpRequest,
+        exclude_parameters: Optional[list] = None,
+    ) -> QuerySet:
+        """Return the changelist queryset with the undisplayed columns deferred."""
+        queryset = super().get_queryset(request, exclude_parameters)
+        return queryset.defer(*self.model_admin.changelist_defer)
+
+
+class DeferredChangeListMixin:
+    """Defer heavy columns (geometries, JSON) on changelist pages only.
+
+    The change form still loads them, since it renders those fields.
+    """
+
+    changelist_defer: tuple = ()
+
+    def get_changelist(
+        self: "DeferredChangeListMixin", request: HttpRequest, **kwargs: Any
+    ) -> type:
+        """Use DeferringChangeList for the changelist view."""
+        return DeferringChangeList
+
+
 # Register your models here.
 @admin.register(Site)
-class SiteAdmin(admin.GISModelAdmin):
+class SiteAdmin(DeferredChangeListMixin, admin.GISModelAdmin):
     """Admin interface for the Site model."""
 
     list_display = ("name", "owner", "created_at", "updated_at")
     list_filter = ("owner", "created_at", "updated_at")
+    search_fields = ("name",)
+    raw_id_fields = ("owner",)
+    list_select_related = ("owner",)
+    changelist_defer = ("boundary", "metadata")
     default_lat = 36.817223
     default_lon = -1.2863
     default_zoom = 12
@@ -22,35 +59,61 @@ class GISLayerAdmin(admin.ModelAdmin):
     """Admin interface for the GISLayer model."""
 
     list_display = ("name", "site", "layer_type", "created_at", "is_active")
-    list_filter = ("site", "layer_type", "created_at", "is_active")
+    # No "site" filter: it would render every Site in the sidebar; search
+    # by site name instead
+    list_filter = ("layer_type", "created_at", "is_active")
     search_fields = ("site__name", "name")
     raw_id_fields = ("site",)
-
-    # def get_queryset(self, request):
-    #     """Override to select related Site for performance."""
-    #     return super().get_queryset(request).select_related("site")
+    list_select_related = ("site",)
 
 
 @admin.register(SatelliteImage)
-class SatelliteImageAdmin(admin.GISModelAdmin):
+class SatelliteImageAdmin(DeferredChangeListMixin, admin.GISModelAdmin):
     """Admin interface for the SatelliteImage model."""
 
     list_display = (
         "site",
         "date_captured",
         "source",
-        "resolution_m_per_pixel",
+        "resolution",
         "cloud_cover_percentage",
         "status",
         "created_at",
     )
-    list_filter = ("site", "source", "status", "date_captured")
+    list_filter = ("source", "status", "date_captured")
     search_fields = (
         "site__name",
         "source",
-        "metadata__id",
-    )  # You can search by site name, source, or metadata
+    )  # You can search by site name, source, or metadata id (see below)
     raw_id_fields = ("site",)
+    list_select_related = ("site",)  # list_display and __str__ read site.name
+    changelist_defer = ("footprint", "metadata")
     default_lon = 36.817223
     default_lat = -1.286389
     default_zoom = 8
+
+    @admin.display(description="Resolution (m/px)", ordering="resolution_m_per_pixel")
+    def resolution(self: "SatelliteImageAdmin", obj: SatelliteImage) -> str:
+        """Show the resolution to two decimal places."""
+        if obj.resolution_m_per_pixel is None:
+            return self.get_empty_value_display()
+        return f"{obj.resolution_m_per_pixel:.2f}"
+
+    def get_search_results(
+        self: "SatelliteImageAdmin",
+        request: HttpRequest,
+        queryset: QuerySet[SatelliteImage],
+        search_term: str,
+    ) -> tuple[QuerySet[SatelliteImage], bool]:
+        """Extend the default search with an exact metadata id match.
+
+        A containment lookup is used instead of metadata__id__icontains so the
+        query can be served by the jsonb_path_ops GIN index on metadata.
+        """
+        results, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        search_term = search_term.strip()
+        if search_term:
+            results |= queryset.filter(metadata__contains={"id": search_term})
+        return results, may_have_duplicates
@@ -1,5 +1,22 @@
 """add configurations for the core app."""
+from typing import Any
+
 from django.apps import AppConfig
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.signals import pre_migrate
+
+from Jadwak.logging_utils import start_queue_listener
+
+
+def ensure_pg_trgm(
+    sender: AppConfig, using: str = DEFAULT_DB_ALIAS, **kwargs: Any
+) -> None:
+    """Install pg_trgm so migrations can create the trigram name indexes."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
 
 
 class CoreConfig(AppConfig):
@@ -7,3 +24,8 @@ class CoreConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self: "CoreConfig") -> None:
+        """Start the log listener and install pg_trgm ahead of migrations."""
+        start_queue_listener()
+        pre_migrate.connect(ensure_pg_trgm, sender=self)
@@ -0,0 +1,22 @@
+"""Serializer fields shared by the core and detection apps."""
+
+from typing import Any
+
+import orjson
+from rest_framework_gis.fields import GeometryField
+
+
+class AnnotatedGeometryField(GeometryField):
+    """GeometryField that prefers GeoJSON already rendered by the database.
+
+    When the queryset annotates ``<field>_geojson`` (e.g. with AsGeoJSON), that
+    string is used directly instead of hydrating a GEOS geometry per row, so the
+    geometry column itself can be deferred.
+    """
+
+    def get_attribute(self: "AnnotatedGeometryField", instance: Any) -> Any:
+        """Return the annotated GeoJSON if present, else the geometry itself."""
+        geojson = getattr(instance, f"{self.source}_geojson", None)
+        if geojson is not None:
+            return orjson.loads(geojson)
+        return super().get_attribute(instance)
@@ -3,6 +3,9 @@
 # Create your models here.
 from django.conf import settings
 from django.contrib.gis.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.fields.json import KT
+from django.db.models.functions import Upper
 
 # from django.utils import timezone
 
@@ -17,6 +20,8 @@ class Site(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="owned_sites",
+        # site_owner_id_idx (owner, id) leads with owner and serves FK lookups
+        db_index=False,
         help_text="Owner of the site",
     )
     boundary = models.PolygonField(
@@ -24,7 +29,6 @@ class Site(models.Model):
     )
     metadata = models.JSONField(
         blank=True,
-        null=True,
         default=dict,
         help_text="flexible json for additional site-specific data",
     )
@@ -41,6 +45,20 @@ class Site(models.Model):
         verbose_name = "Site"
         verbose_name_plural = "Sites"
         ordering = ["created_at"]
+        indexes = [
+            # (owner, id) lets ownership joins (site__owner_id=...) resolve
+            # site ids from the index alone
+            models.Index(fields=["owner", "id"], name="site_owner_id_idx"),
+            models.Index(fields=["created_at"], name="site_created_at_idx"),
+            # Trigram index on UPPER(name) backs the admin's name__icontains
+            # search (pg_trgm is installed by CoreConfig before migrating)
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"), name="site_name_trgm"
+            ),
+            GinIndex(
+                fields=["metadata"], name="site_meta_gin", opclasses=["jsonb_path_ops"]
+            ),
+        ]
 
     def __str__(self: "Site") -> str:
         """Return String representation of the Site model."""
@@ -64,6 +82,8 @@ class GISLayer(models.Model):
         Site,
         on_delete=models.CASCADE,
         related_name="gis_layers",
+        # The (site, name) unique constraint leads with site and serves FK lookups
+        db_index=False,
         help_text="Site associated with this GIS layer",
     )
     name = models.CharField(max_length=255, help_text="Name of the GIS layer")
@@ -87,6 +107,16 @@ class GISLayer(models.Model):
         verbose_name_plural = "GIS Layers"
         unique_together = ("site", "name")
         ordering = ["created_at"]
+        indexes = [
+            models.Index(
+                fields=["site", "is_active", "created_at"],
+                name="gislayer_site_active_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="gislayer_name_trgm",
+            ),
+        ]
 
     def __str__(self: "GISLayer") -> str:
         """Return string representation of the GISLayer model."""
@@ -115,6 +145,8 @@ class SatelliteImage(models.Model):
         "core.site",
         on_delete=models.CASCADE,
         related_name="satellite_images",
+        # satimg_site_status_date_idx leads with site and serves FK lookups
+        db_index=False,
         help_text="Site associated with this satellite image",
     )
     image_file = models.FileField(
@@ -126,9 +158,7 @@ class SatelliteImage(models.Model):
         help_text="Date and time when the image was captured",
     )
 
-    resolution_m_per_pixel = models.DecimalField(
-        max_digits=5,
-        decimal_places=2,
+    resolution_m_per_pixel = models.FloatField(
         null=True,
         blank=True,
         help_text="Resolution of the image in meters per pixel",
@@ -154,7 +184,6 @@ class SatelliteImage(models.Model):
 
     metadata = models.JSONField(
         blank=True,
-        null=True,
         default=dict,
         help_text="Flexible JSON for additional image-specific metadata",
     )
@@ -182,6 +211,34 @@ class SatelliteImage(models.Model):
         verbose_name = "Satellite Image"
         verbose_name_plural = "Satellite Images"
         ordering = ["date_captured"]
+        indexes = [
+            # Default ordering and the admin date_captured filter
+            models.Index(fields=["date_captured"], name="satimg_date_captured_idx"),
+            # Per-site status filters, newest capture first
+            models.Index(
+                fields=["site", "status", "-date_captured"],
+                name="satimg_site_status_date_idx",
+            ),
+            models.Index(
+                fields=["source", "-date_captured"], name="satimg_source_date_idx"
+            ),
+            # Cursor pagination of a site's images (SatelliteImageViewSet)
+            models.Index(
+                fields=["site", "-date_captured", "-id"], name="satimg_site_date_idx"
+            ),
+            # Serves metadata__contains lookups such as the admin metadata id search
+            GinIndex(
+                fields=["metadata"], name="sat_meta_gin", opclasses=["jsonb_path_ops"]
+            ),
+        ]
+        constraints = [
+            # A provider's image id may only be ingested once
+            models.UniqueConstraint(
+                models.F("source"),
+                KT("metadata__id"),
+                name="satimg_source_external_id_uniq",
+            ),
+        ]
 
     def __str__(self: "SatelliteImage") -> str:
         """Return string representation of the SatelliteImage model."""
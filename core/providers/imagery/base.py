@@ -2,14 +2,18 @@
 
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
+from asgiref.sync import sync_to_async
 from django.contrib.gis.geos import GEOSGeometry
 
 
 class BaseImageryProvider(ABC):
     """Abstract base class for satellite imagery providers."""
 
+    # Preferred size of the chunks yielded by get_image_file_data (1 MiB)
+    IMAGE_CHUNK_SIZE = 1 << 20
+
     def __init__(
         self: "BaseImageryProvider",
         api_key: Optional[str] = None,
@@ -31,6 +35,10 @@ class BaseImageryProvider(ABC):
         """
         Query the imagery provider for images within the specified criteria.
 
+        Implementations should pass cloud_cover_max and resolution_max to the
+        provider's API (e.g. an eo:cloud_cover STAC filter) so that the server
+        does the filtering, rather than filtering the results afterwards.
+
         Args:
             bbox: A GEOSGeometry object (Polygon) representing the area of interest.
             start_date: Start datetime for image capture.
@@ -57,18 +65,64 @@ class BaseImageryProvider(ABC):
         pass
 
     @abstractmethod
-    def get_image_file_data(self: "BaseImageryProvider", image_url: str) -> bytes:
+    def get_image_file_data(
+        self: "BaseImageryProvider", image_url: str
+    ) -> Iterator[bytes]:
         """
-        Retrieve raw byte data of an image from the given URL.
+        Stream the raw byte data of an image from the given URL.
+
+        Implementations should yield chunks of roughly IMAGE_CHUNK_SIZE bytes
+        (e.g. Jadwak.http.pooled_session().get(url, stream=True)
+        .iter_content(self.IMAGE_CHUNK_SIZE))
+        rather than loading the whole file into memory.
 
         Args:
             image_url: URL to download the image.
 
         Returns:
-            A byte array representing the image file content.
+            An iterator over chunks of the image file content.
         """
         pass
 
+    async def aquery_imagery(
+        self: "BaseImageryProvider",
+        bbox: GEOSGeometry,
+        start_date: datetime,
+        end_date: datetime,
+        cloud_cover_max: float = 100.0,
+        resolution_max: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Async counterpart of query_imagery.
+
+        The default runs query_imagery in a worker thread. Providers backed by an
+        async HTTP client (e.g. aiohttp) can override this to issue their
+        requests concurrently with asyncio.gather.
+        """
+        return await sync_to_async(self.query_imagery, thread_sensitive=False)(
+            bbox,
+            start_date,
+            end_date,
+            cloud_cover_max=cloud_cover_max,
+            resolution_max=resolution_max,
+        )
+
+    async def aget_image_file_data(
+        self: "BaseImageryProvider", image_url: str
+    ) -> AsyncIterator[bytes]:
+        """
+        Async counterpart of get_image_file_data.
+
+        The default pulls each chunk from the synchronous iterator in a worker
+        thread, so the event loop is never blocked on the download.
+        """
+        chunks = await sync_to_async(
+            lambda: iter(self.get_image_file_data(image_url)), thread_sensitive=False
+        )()
+        next_chunk = sync_to_async(next, thread_sensitive=False)
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+
     @abstractmethod
     def parse_api_metadata(
         self: "BaseImageryProvider", raw_metadata: Dict[str, Any]
@@ -1,16 +1,23 @@
 """Mock implementation of a Sentinel-2 satellite imagery provider for testing."""
 
-import json
+import logging
 import random
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
 
-import pytz
+import orjson
 from django.contrib.gis.geos import GEOSGeometry, Polygon
 from django.utils import timezone as django_timezone
 
 from .base import BaseImageryProvider
 
+logger = logging.getLogger(__name__)
+
+_UTC = timezone.utc
+
+# Ground resolutions (metres per pixel) the mock draws from
+_S2_RESOLUTIONS = (10.0, 20.0)
+
 
 class Sentinel2Provider(BaseImageryProvider):
     """Simulates a provider that fetches Sentinel-2 imagery."""
@@ -33,78 +40,83 @@ class Sentinel2Provider(BaseImageryProvider):
             start_date: Start of capture date range.
             end_date: End of capture date range.
             cloud_cover_max: Max allowed cloud cover.
-            resolution_max: Max desired resolution (unused in mock).
+            resolution_max: Max desired resolution; coarser images are not returned.
 
         Returns:
             A list of mocked image metadata dictionaries.
         """
-        print(
-            f"MOCK Sentinel2: Querying for bbox={bbox.wkt}, "
-            f"dates={start_date.date()} to {end_date.date()}, "
-            f"cloud_cover_max={cloud_cover_max}"
+        logger.debug(
+            "MOCK Sentinel2: Querying for dates=%s to %s, cloud_cover_max=%s, "
+            "resolution_max=%s",
+            start_date.date(),
+            end_date.date(),
+            cloud_cover_max,
+            resolution_max,
         )
 
+        # Apply the filters while generating, as a real API would server-side,
+        # so callers never receive images they have to discard
+        resolutions = [
+            r for r in _S2_RESOLUTIONS if resolution_max is None or r <= resolution_max
+        ]
+        if not resolutions:
+            return []
+        cloud_cover_max = min(cloud_cover_max, 100.0)
+
         results = []
         num_images = random.randint(1, 3)
 
+        # Loop-invariant values: the bbox extent, the jitter range for each
+        # footprint vertex and the capture-date window.
+        min_x, min_y, max_x, max_y = bbox.extent
+        jitter_x = (max_x - min_x) * 0.1
+        jitter_y = (max_y - min_y) * 0.1
+        # Each vertex sits near a bbox corner, nudged inwards by the jitter
+        corners = (
+            (min_x, 1, min_y, 1),
+            (min_x, 1, min_y, 1),
+            (min_x, 1, max_y, -1),
+            (max_x, -1, max_y, -1),
+            (max_x, -1, min_y, 1),
+            (min_x, 1, min_y, 1),
+        )
+        window_seconds = int((end_date - start_date).total_seconds())
+        uniform = random.uniform
+        randint = random.randint
+
         for _ in range(num_images):
-            time_difference = end_date - start_date
-            random_seconds = random.randint(0, int(time_difference.total_seconds()))
+            random_seconds = randint(0, window_seconds)
             capture_date = start_date + timedelta(seconds=random_seconds)
 
             if capture_date.tzinfo is None:
-                capture_date = pytz.utc.localize(capture_date)
+                capture_date = capture_date.replace(tzinfo=_UTC)
             else:
-                capture_date = capture_date.astimezone(pytz.utc)
-
-            min_x, min_y, max_x, max_y = bbox.extent
+                capture_date = capture_date.astimezone(_UTC)
 
-            p1_x = min_x + random.uniform(0, (max_x - min_x) * 0.1)
-            p1_y = min_y + random.uniform(0, (max_y - min_y) * 0.1)
-
-            footprint_polygon = Polygon(
-                (
-                    (p1_x, p1_y),
-                    (
-                        min_x + random.uniform(0, (max_x - min_x) * 0.1),
-                        min_y + random.uniform(0, (max_y - min_y) * 0.1),
-                    ),
-                    (
-                        min_x + random.uniform(0, (max_x - min_x) * 0.1),
-                        max_y - random.uniform(0, (max_y - min_y) * 0.1),
-                    ),
-                    (
-                        max_x - random.uniform(0, (max_x - min_x) * 0.1),
-                        max_y - random.uniform(0, (max_y - min_y) * 0.1),
-                    ),
-                    (
-                        max_x - random.uniform(0, (max_x - min_x) * 0.1),
-                        min_y + random.uniform(0, (max_y - min_y) * 0.1),
-                    ),
-                    (
-                        min_x + random.uniform(0, (max_x - min_x) * 0.1),
-                        min_y + random.uniform(0, (max_y - min_y) * 0.1),
-                    ),
-                    (p1_x, p1_y),
-                ),
-                srid=4326,
-            )
+            ring = [
+                (x + dx * uniform(0, jitter_x), y + dy * uniform(0, jitter_y))
+                for x, dx, y, dy in corners
+            ]
+            ring.append(ring[0])
 
+            # One strftime per image; the day used in the URL is its prefix
+            timestamp = capture_date.strftime("%Y%m%d%H%M%S")
             dummy_meta = {
-                "id": f"S2_MOCK_{capture_date.strftime('%Y%m%d%H%M%S')}_{random.randint(1000, 9999)}",
+                "id": f"S2_MOCK_{timestamp}_{randint(1000, 9999)}",
                 "type": "Feature",
                 "properties": {
-                    "cloud_cover": min(random.uniform(0, cloud_cover_max + 5), 100.0),
+                    "cloud_cover": random.uniform(0, cloud_cover_max),
                     "acquisition_date": capture_date.isoformat(),
-                    "resolution_in_meters": random.choice([10.0, 20.0]),
+                    "resolution_in_meters": random.choice(resolutions),
                     "product_type": "S2MSI2A",
-                    "tile_id": "MOCK_TILE_" + str(random.randint(1, 100)),
+                    "tile_id": f"MOCK_TILE_{randint(1, 100)}",
                     "download_link": (
                         f"http://mock-sentinel2-data.com/images/s2_"
-                        f"{capture_date.strftime('%Y%m%d')}_{random.randint(1000, 9999)}.tiff"
+                        f"{timestamp[:8]}_{randint(1000, 9999)}.tiff"
                     ),
                 },
-                "geometry": json.loads(footprint_polygon.geojson),
+                # GeoJSON built straight from the vertices, no GEOS round trip
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
             }
             results.append(dummy_meta)
 
@@ -120,9 +132,9 @@ class Sentinel2Provider(BaseImageryProvider):
         Returns:
             A dictionary representing the image metadata.
         """
-        print(f"MOCK Sentinel2: Getting details for image_id={image_id}")
+        logger.debug("MOCK Sentinel2: Getting details for image_id=%s", image_id)
 
-        now_utc_aware = pytz.utc.localize(datetime.now())
+        now_utc_aware = datetime.now(_UTC)
         return {
             "id": image_id,
             "properties": {
@@ -131,23 +143,25 @@ class Sentinel2Provider(BaseImageryProvider):
                 "cloud_cover": 5.0,
                 "download_link": f"http://mock.com/image/{image_id}.tiff",
             },
-            "geometry": json.loads(
+            "geometry": orjson.loads(
                 Polygon(((0, 0), (0, 1), (1, 1), (1, 0), (0, 0)), srid=4326).geojson
             ),
         }
 
-    def get_image_file_data(self: "Sentinel2Provider", image_url: str) -> bytes:
+    def get_image_file_data(
+        self: "Sentinel2Provider", image_url: str
+    ) -> Iterator[bytes]:
         """
-        Simulate retrieving raw image byte data from a URL.
+        Simulate streaming raw image byte data from a URL.
 
         Args:
             image_url: The mock image URL.
 
         Returns:
-            A byte string representing fake image content.
+            An iterator yielding the fake image content as a single chunk.
         """
-        print(f"MOCK Sentinel2: Retrieving raw data for {image_url}")
-        return b"This is a dummy satellite image file content for Jenga. It's not a real image."
+        logger.debug("MOCK Sentinel2: Retrieving raw data for %s", image_url)
+        yield b"This is a dummy satellite image file content for Jenga. It's not a real image."
 
     def parse_api_metadata(
         self: "Sentinel2Provider", raw_metadata: Dict[str, Any]
@@ -171,20 +185,27 @@ class Sentinel2Provider(BaseImageryProvider):
             try:
                 parsed_dt_naive = datetime.fromisoformat(date_captured_str)
                 if parsed_dt_naive.tzinfo is None:
-                    date_captured = pytz.utc.localize(parsed_dt_naive)
+                    date_captured = parsed_dt_naive.replace(tzinfo=_UTC)
+                elif parsed_dt_naive.tzinfo is _UTC:
+                    date_captured = parsed_dt_naive
                 else:
-                    date_captured = parsed_dt_naive.astimezone(pytz.utc)
+                    date_captured = parsed_dt_naive.astimezone(_UTC)
             except ValueError:
-                print(
-                    f"Warning: Could not parse acquisition_date '{date_captured_str}'. "
-                    "Falling back to current UTC time."
+                logger.warning(
+                    "Could not parse acquisition_date '%s'. "
+                    "Falling back to current UTC time.",
+                    date_captured_str,
                 )
                 date_captured = django_timezone.now()
         else:
             date_captured = django_timezone.now()
 
-        footprint_geojson = json.dumps(geometry_data)
-        footprint = GEOSGeometry(footprint_geojson, srid=4326)
+        if isinstance(geometry_data, GEOSGeometry):
+            footprint = geometry_data
+        elif geometry_data.get("type") == "Polygon":
+            footprint = Polygon(*geometry_data["coordinates"], srid=4326)
+        else:
+            footprint = GEOSGeometry(orjson.dumps(geometry_data).decode(), srid=4326)
 
         return {
             "date_captured": date_captured,
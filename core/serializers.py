@@ -1,11 +1,15 @@
 """Serializers module for the core app."""
 
+from typing import Any
+
+import orjson
 from rest_framework import serializers
 from rest_framework_gis.serializers import GeoFeatureModelSerializer
 
 from detection.serializers import DetectionSerializer
 
 
+from .fields import AnnotatedGeometryField
 from .models import GISLayer, SatelliteImage, Site
 
 
@@ -13,6 +17,7 @@ class SiteSerializer(GeoFeatureModelSerializer):
     """Serializer for the Site model."""
 
     owner_username = serializers.ReadOnlyField(source="owner.username")
+    boundary = AnnotatedGeometryField()
 
     class Meta:
         """Meta options for the SiteSerializer."""
@@ -31,6 +36,36 @@ class SiteSerializer(GeoFeatureModelSerializer):
         )
         read_only_fields = ("created_at", "updated_at")
 
+    def to_representation(self: "SiteSerializer", instance: Site) -> dict:
+        """Serialize a Site as a GeoJSON Feature.
+
+        Rows from SiteViewSet's read actions carry a boundary_geojson
+        annotation; those are built directly instead of walking every field
+        through the generic GeoFeatureModelSerializer machinery. Keep the keys
+        in sync with Meta.fields.
+        """
+        boundary_geojson = getattr(instance, "boundary_geojson", None)
+        if boundary_geojson is None:
+            return super().to_representation(instance)
+        fields = self.fields
+        return {
+            "id": instance.pk,
+            "type": "Feature",
+            "geometry": orjson.loads(boundary_geojson),
+            "properties": {
+                "name": instance.name,
+                "owner": instance.owner_id,
+                "owner_username": instance.owner.username,
+                "metadata": instance.metadata,
+                "created_at": fields["created_at"].to_representation(
+                    instance.created_at
+                ),
+                "updated_at": fields["updated_at"].to_representation(
+                    instance.updated_at
+                ),
+            },
+        }
+
     def create(self: "SiteSerializer", validated_data: dict) -> Site:
         """Create a new Site instance."""
         return super().create(validated_data)
@@ -60,6 +95,29 @@ class GISLayerSerializer(serializers.ModelSerializer):
         read_only_fields = ("created_at", "updated_at")
 
 
+class FetchImagerySerializer(serializers.Serializer):
+    """Validate the date range for a Sentinel-2 imagery fetch."""
+
+    start_date = serializers.DateTimeField(input_formats=["iso-8601", "%Y-%m-%d"])
+    end_date = serializers.DateTimeField(input_formats=["iso-8601", "%Y-%m-%d"])
+
+    def validate(self: "FetchImagerySerializer", attrs: dict) -> dict:
+        """Ensure the range is not inverted."""
+        if attrs["start_date"] > attrs["end_date"]:
+            raise serializers.ValidationError("start_date must not be after end_date.")
+        return attrs
+
+
+class BulkFetchImagerySerializer(FetchImagerySerializer):
+    """Validate the sites and date range for a multi-site imagery fetch."""
+
+    site_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=500,
+    )
+
+
 class SatelliteImageSerializer(GeoFeatureModelSerializer):
     """Serializer for the SatelliteImage model with GeoJSON footprint."""
 
@@ -67,7 +125,7 @@ class SatelliteImageSerializer(GeoFeatureModelSerializer):
 
     detection_data = DetectionSerializer(source="detections", many=True, read_only=True)
 
-    thumbnail_url = serializers.SerializerMethodField()
+    footprint = AnnotatedGeometryField()
 
     class Meta:
         """Meta options for the SatelliteImageSerializer."""
@@ -88,13 +146,28 @@ class SatelliteImageSerializer(GeoFeatureModelSerializer):
             "status",
             "created_at",
             "updated_at",
-            "thumbnail_url",
             "detection_data",
         )
         read_only_fields = ("created_at", "updated_at")
 
-    def get_thumbnail_url(self: SatelliteImage, obj: SatelliteImage) -> str:
-        """Generate a URL for the thumbnail of the satellite image."""
-        if obj.image_file:
-            return obj.image_file.url.replace("images/", "thumbnails/")
-        return None
+    def __init__(self: "SatelliteImageSerializer", *args: Any, **kwargs: Any) -> None:
+        """Drop detection_data unless the context asks for it."""
+        super().__init__(*args, **kwargs)
+        if not self.context.get("include_detections", True):
+            self.fields.pop("detection_data")
+
+    def to_representation(
+        self: "SatelliteImageSerializer", instance: SatelliteImage
+    ) -> dict:
+        """Serialize the image, adding a thumbnail_url derived from image_file.
+
+        The thumbnail URL reuses the image_file URL already rendered for this
+        row, so storage (e.g. S3 presigning) is asked for one URL, not two.
+        """
+        data = super().to_representation(instance)
+        properties = data.get("properties", data)
+        image_url = properties.get("image_file")
+        properties["thumbnail_url"] = (
+            image_url.replace("images/", "thumbnails/") if image_url else None
+        )
+        return data
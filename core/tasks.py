@@ -1,38 +1,99 @@
 """Celery tasks for image processing and Sentinel-2 imagery fetching."""
 
+import functools
+import logging
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from datetime import timezone as dt_timezone
+from itertools import batched
 
-import pytz
-from celery import Task, shared_task
-from django.core.files.base import ContentFile
-from django.db import transaction
+from celery import Task, group, shared_task
+from django.conf import settings
+from django.core.files import File
+from django.db import InterfaceError, OperationalError, transaction
+from django.db.models.fields.json import KT
 from django.utils import timezone
 
 from core.models import SatelliteImage, Site
+from core.providers.imagery.base import BaseImageryProvider
 from core.providers.imagery.sentinel2 import Sentinel2Provider
 
-from detection.tasks import process_image_detections
+from detection.tasks import process_image_detections_batch
 
+logger = logging.getLogger(__name__)
 
-@shared_task
+# Downloads larger than this are spooled to a temporary file on disk
+_IMAGE_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+# Rows per INSERT when ingesting provider results
+_BULK_CREATE_BATCH_SIZE = 500
+
+# Images per AI inference request when detecting on newly fetched imagery
+_DETECTION_BATCH_SIZE = 16
+
+# The sleeping example tasks run on their own queue so they never hold a slot
+# on the default workers; docker-compose's celery_demo_worker consumes it
+# (`celery -A Jadwak worker -Q demo --concurrency=1`)
+_DEMO_QUEUE = "demo"
+
+
+def _parse_utc(value: str) -> datetime:
+    """Parse an ISO 8601 string as an aware UTC datetime (naive means UTC)."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=dt_timezone.utc)
+    return parsed.astimezone(dt_timezone.utc)
+
+
+@functools.lru_cache(maxsize=None)
+def _sentinel2_provider() -> Sentinel2Provider:
+    """Return this worker process's shared Sentinel2Provider."""
+    return Sentinel2Provider()
+
+
+def _store_image_file(
+    provider: BaseImageryProvider,
+    satellite_image: SatelliteImage,
+    download_link: str,
+    file_name: str,
+) -> SatelliteImage:
+    """Stream a provider download into the image's file storage.
+
+    Runs in a download worker thread, so it must not touch the database.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=_IMAGE_SPOOL_MAX_SIZE) as image_spool:
+        # Stream the download so memory use is bounded by the spool
+        for chunk in provider.get_image_file_data(download_link):
+            image_spool.write(chunk)
+        image_spool.seek(0)
+
+        # Store the file now so the spool can be closed before the rows are
+        # inserted in bulk
+        satellite_image.image_file.save(file_name, File(image_spool), save=False)
+    return satellite_image
+
+
+@shared_task(queue=_DEMO_QUEUE)
 def example_task(arg1: int, arg2: str) -> int:
     """Simulate a long-running task and return a computed value."""
     start_time = timezone.now()
-    print(f"Task started at {start_time} with arguments: {arg1}, {arg2}")
+    logger.info("Task started at %s with arguments: %s, %s", start_time, arg1, arg2)
     time.sleep(5)
     end_time = timezone.now()
-    print(f"Task ended at {end_time}")
+    logger.info("Task ended at %s", end_time)
     duration = (end_time - start_time).total_seconds()
-    print(f"Task duration: {duration} seconds")
+    logger.info("Task duration: %s seconds", duration)
     return arg1 + len(arg2)
 
 
-@shared_task
+@shared_task(queue=_DEMO_QUEUE)
 def another_example_task() -> None:
     """Run a dummy task that simply waits."""
-    print(
-        f"This is another example task that does nothing. Running at {timezone.now()}"
+    logger.info(
+        "This is another example task that does nothing. Running at %s",
+        timezone.now(),
     )
     time.sleep(2)
 
@@ -45,15 +106,19 @@ def fetch_sentinel2_imagery(
     try:
         site = Site.objects.get(id=site_id)
 
-        start_date = pytz.utc.localize(datetime.fromisoformat(start_date_str))
-        end_date = pytz.utc.localize(datetime.fromisoformat(end_date_str))
+        # FetchImagerySerializer already validated these in the view
+        start_date = _parse_utc(start_date_str)
+        end_date = _parse_utc(end_date_str)
 
-        print(
-            f"Fetching Sentinel-2 imagery for Site: {site.name} ({site.id}) "
-            f"from {start_date.date()} to {end_date.date()}"
+        logger.info(
+            "Fetching Sentinel-2 imagery for Site: %s (%s) from %s to %s",
+            site.name,
+            site.id,
+            start_date.date(),
+            end_date.date(),
         )
 
-        provider = Sentinel2Provider()
+        provider = _sentinel2_provider()
 
         imagery_results = provider.query_imagery(
             bbox=site.boundary,
@@ -63,58 +128,163 @@ def fetch_sentinel2_imagery(
         )
 
         if not imagery_results:
-            print(
-                f"No Sentinel-2 imagery found for site {site.name} in the specified date range and criteria."
+            logger.info(
+                "No Sentinel-2 imagery found for site %s in the specified "
+                "date range and criteria.",
+                site.name,
             )
             return "No imagery found."
 
-        fetched_count = 0
+        parsed_results = []
         for result in imagery_results:
             try:
-                parsed_data = provider.parse_api_metadata(result)
-                dummy_image_content_bytes = provider.get_image_file_data(
-                    parsed_data.get("metadata", {})
-                    .get("properties", {})
-                    .get("download_link", "")
+                parsed_results.append(provider.parse_api_metadata(result))
+            except Exception:
+                logger.exception(
+                    "Error processing a SatelliteImage result for site %s", site.name
                 )
 
-                with transaction.atomic():
-                    satellite_image = SatelliteImage.objects.create(
-                        site=site,
-                        image_file=ContentFile(
-                            dummy_image_content_bytes,
-                            name=f"{site.name.replace(' ', '_')}_S2_"
-                            f"{parsed_data['date_captured'].strftime('%Y%m%d_%H%M%S')}.tiff",
-                        ),
-                        date_captured=parsed_data["date_captured"],
-                        resolution_m_per_pixel=parsed_data["resolution_m_per_pixel"],
-                        source=parsed_data["source"],
-                        cloud_cover_percentage=parsed_data["cloud_cover_percentage"],
-                        footprint=parsed_data["footprint"],
-                        metadata=parsed_data["metadata"],
-                        status="FETCHED",
-                    )
-                    fetched_count += 1
-                    print(
-                        f"Successfully created SatelliteImage: {satellite_image.pk} "
-                        f"for site {site.name}. Triggering AI processing"
-                    )
-                    process_image_detections.delay(satellite_image.pk)
+        # One query for the images already ingested instead of one per result
+        external_ids = [
+            parsed_data["metadata"]["id"]
+            for parsed_data in parsed_results
+            if parsed_data["metadata"].get("id")
+        ]
+        # metadata->>'id' (KT) matches the unique (source, metadata id)
+        # expression index; metadata__id would compare jsonb and scan instead
+        existing_ids = set(
+            SatelliteImage.objects.annotate(ext_id=KT("metadata__id"))
+            .filter(source=provider.PROVIDER_NAME, ext_id__in=external_ids)
+            .values_list("ext_id", flat=True)
+        )
 
-            except Exception as e:
-                print(
-                    f"Error processing a SatelliteImage result for site {site.name}: {e}"
+        downloads = []
+        for parsed_data in parsed_results:
+            if parsed_data["metadata"].get("id") in existing_ids:
+                logger.info(
+                    "Skipping already ingested image %s for site %s.",
+                    parsed_data["metadata"]["id"],
+                    site.name,
                 )
                 continue
+            if parsed_data["metadata"].get("id"):
+                # Guard against the provider repeating an id in one response
+                existing_ids.add(parsed_data["metadata"]["id"])
+            satellite_image = SatelliteImage(
+                site=site,
+                date_captured=parsed_data["date_captured"],
+                resolution_m_per_pixel=parsed_data["resolution_m_per_pixel"],
+                source=parsed_data["source"],
+                cloud_cover_percentage=parsed_data["cloud_cover_percentage"],
+                footprint=parsed_data["footprint"],
+                metadata=parsed_data["metadata"],
+                status="FETCHED",
+            )
+            download_link = (
+                parsed_data.get("metadata", {})
+                .get("properties", {})
+                .get("download_link", "")
+            )
+            file_name = (
+                f"{site.name.replace(' ', '_')}_S2_"
+                f"{parsed_data['date_captured'].strftime('%Y%m%d_%H%M%S')}.tiff"
+            )
+            downloads.append((satellite_image, download_link, file_name))
+
+        # Downloads are network-bound, so overlap them in threads; the rows are
+        # still inserted from this thread below
+        new_images = []
+        if downloads:
+            max_workers = min(
+                len(downloads), getattr(settings, "IMAGERY_DOWNLOAD_WORKERS", 8)
+            )
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(_store_image_file, provider, *download)
+                    for download in downloads
+                ]
+                for future in as_completed(futures):
+                    try:
+                        new_images.append(future.result())
+                    except Exception:
+                        logger.exception(
+                            "Error processing a SatelliteImage result for site %s",
+                            site.name,
+                        )
+
+        with transaction.atomic():
+            # A concurrent fetch may ingest the same provider images first; the
+            # unique (source, metadata id) constraint makes those rows no-ops
+            # here instead of failing the whole batch with an IntegrityError
+            SatelliteImage.objects.bulk_create(
+                new_images,
+                batch_size=_BULK_CREATE_BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+            # Conflicting inserts return no primary keys, so re-read the rows
+            # this task stored (every stored file has its own name), within the
+            # site so the site indexes bound the lookup
+            stored_pks = dict(
+                SatelliteImage.objects.filter(
+                    site=site,
+                    image_file__in=[image.image_file.name for image in new_images],
+                ).values_list("image_file", "pk")
+            )
+            skipped_images = []
+            for satellite_image in new_images:
+                satellite_image.pk = stored_pks.get(satellite_image.image_file.name)
+                if satellite_image.pk is None:
+                    skipped_images.append(satellite_image)
+            new_images = [image for image in new_images if image.pk is not None]
+            for satellite_image in new_images:
+                logger.info(
+                    "Successfully created SatelliteImage: %s for site %s. "
+                    "Triggering AI processing",
+                    satellite_image.pk,
+                    site.name,
+                )
+            # Dispatch once the rows are visible to the workers, publishing the
+            # whole batch in a single group call
+            if new_images:
+                # Images of similar resolution share an inference batch
+                image_ids = [
+                    satellite_image.pk
+                    for satellite_image in sorted(
+                        new_images,
+                        key=lambda image: image.resolution_m_per_pixel or 0.0,
+                    )
+                ]
+                detection_jobs = group(
+                    [
+                        process_image_detections_batch.s(list(batch))
+                        for batch in batched(image_ids, _DETECTION_BATCH_SIZE)
+                    ]
+                )
+                transaction.on_commit(detection_jobs.apply_async)
+        # Files downloaded for images another fetch ingested first are orphans
+        for satellite_image in skipped_images:
+            logger.info(
+                "Image %s for site %s was ingested concurrently; discarding %s.",
+                satellite_image.metadata.get("id"),
+                site.name,
+                satellite_image.image_file.name,
+            )
+            satellite_image.image_file.delete(save=False)
+        fetched_count = len(new_images)
 
         return f"Successfully fetched and processed {fetched_count} images for site {site.name}."
 
     except Site.DoesNotExist:
-        print(f"Error: Site with ID {site_id} does not exist. Aborting task.")
+        logger.error("Site with ID %s does not exist. Aborting task.", site_id)
         raise
 
-    except Exception as e:
-        print(
-            f"An unexpected error occurred while fetching Sentinel-2 imagery for site {site_id}: {e}"
+    except (OSError, OperationalError, InterfaceError) as e:
+        # Network (requests errors are OSErrors) and database connection
+        # failures are transient; anything else would fail again on retry
+        logger.warning(
+            "A transient error occurred while fetching Sentinel-2 imagery "
+            "for site %s: %s",
+            site_id,
+            e,
         )
         self.retry(exc=e)
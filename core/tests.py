@@ -1,5 +1,9 @@
 """tests module for core app."""
 
+import pytest
+
+from core.serializers import BulkFetchImagerySerializer
+
 # import json
 
 # import pytest
@@ -293,3 +297,43 @@
 #         response.data[0]["name"] == layer2.name
 #         or response.data[1]["name"] == layer2.name
 #     )
+
+
+# --- Serializer Tests for bulk imagery fetches ---
+
+_BULK_FETCH_DATES = {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+
+
+def test_bulk_fetch_serializer_accepts_site_ids_and_range() -> None:
+    """A list of positive site ids and an ordered date range validates."""
+    serializer = BulkFetchImagerySerializer(
+        data={"site_ids": [1, 2, 3], **_BULK_FETCH_DATES}
+    )
+
+    assert serializer.is_valid(), serializer.errors
+    assert serializer.validated_data["site_ids"] == [1, 2, 3]
+
+
+@pytest.mark.parametrize(
+    "site_ids",
+    [[], [0], [1, "abc"], list(range(1, 502))],
+    ids=["empty", "non-positive", "non-integer", "too-many"],
+)
+def test_bulk_fetch_serializer_rejects_invalid_site_ids(site_ids: list) -> None:
+    """Empty, non-positive, non-integer or more than 500 site ids are rejected."""
+    serializer = BulkFetchImagerySerializer(
+        data={"site_ids": site_ids, **_BULK_FETCH_DATES}
+    )
+
+    assert not serializer.is_valid()
+    assert list(serializer.errors) == ["site_ids"]
+
+
+def test_bulk_fetch_serializer_rejects_inverted_range() -> None:
+    """The date range check of FetchImagerySerializer still applies."""
+    serializer = BulkFetchImagerySerializer(
+        data={"site_ids": [1], "start_date": "2024-02-01", "end_date": "2024-01-01"}
+    )
+
+    assert not serializer.is_valid()
+    assert "non_field_errors" in serializer.errors
@@ -8,33 +8,19 @@ from .views import GISLayerViewSet, SatelliteImageViewSet, SiteViewSet
 router = DefaultRouter()
 router.register(r"sites", SiteViewSet, basename="site")
 router.register(r"gis-layers", GISLayerViewSet, basename="gis-layer")
+# Images are nested under their site; the router passes site_pk and pk through
+# to the viewset and names the routes site-satelliteimage-<action>
+router.register(
+    r"sites/(?P<site_pk>\d+)/images",
+    SatelliteImageViewSet,
+    basename="site-satelliteimage",
+)
 
 
 urlpatterns = [
     path("", include(router.urls)),  # Include the router's URLs
     path("example/", lambda request: None, name="example"),  # Example endpoint
-    path(
-        "sites/<int:site_pk>/images/",
-        SatelliteImageViewSet.as_view({"get": "list"}),
-        name="site-satelliteimage-list",
-    ),
-    path(
-        "sites/<int:site_pk>/images/<int:image_pk>/",
-        SatelliteImageViewSet.as_view({"get": "retrieve"}),
-        name="site-satelliteimage-detail",
-    ),
-    path(
-        "sites/<int:site_pk>/images/<int:pk>/run-detection/",
-        SatelliteImageViewSet.as_view(
-            {"post": "run_detection"}
-        ),  # Map POST request to run_detection method
-        name="satelliteimage-run-detection",
-    ),
-    path(
-        "sites/<int:site_pk>/images/<int:pk>/detections-geojson/",
-        SatelliteImageViewSet.as_view({"get": "detections_geojson"}),
-        name="satelliteimage-detections-geojson",
-    ),
+    # Site-wide detections live beside the site rather than under /images/
     path(
         "sites/<int:site_pk>/all-detections-geojson/",
         SatelliteImageViewSet.as_view({"get": "all_detections_geojson"}),
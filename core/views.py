@@ -1,17 +1,29 @@
 """view definitions for core app."""
 
-from datetime import datetime
-import json
-import pytz
+from datetime import datetime, timezone
+import hashlib
+from typing import Any, Iterator, Optional
 
 # Third-party imports
-from django.db.models import QuerySet
+from celery import group
+from django.conf import settings
+from django.contrib.gis.db.models.functions import AsGeoJSON
+from django.core.cache import cache
+from django.db import connection
+from django.contrib.postgres.aggregates import JSONBAgg
+from django.db.models import Count, F, JSONField, Max, Prefetch, QuerySet
+from django.db.models import TextField, Value
+from django.db.models.functions import Cast, JSONObject
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
 from django_filters import DateFromToRangeFilter, FilterSet
 from django_filters import rest_framework as filters
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -20,10 +32,11 @@ from rest_framework.views import APIView
 from core.tasks import fetch_sentinel2_imagery
 
 from .models import GISLayer, SatelliteImage, Site
+from .serializers import BulkFetchImagerySerializer, FetchImagerySerializer
 from .serializers import GISLayerSerializer
 from .serializers import SatelliteImageSerializer, SiteSerializer
 
-from detection.tasks import process_image_detections
+from detection.tasks import detections_geojson_cache_key, process_image_detections
 from detection.models import Detection
 
 
@@ -34,13 +47,23 @@ class IsSiteOwnerOrAdmin(permissions.BasePermission):
         self: "IsSiteOwnerOrAdmin", request: Request, view: APIView, obj: Site
     ) -> bool:
         """Allow access if the user is an admin or the owner of the site."""
+        user = request.user
         if request.method in permissions.SAFE_METHODS:
-            return request.user.is_authenticated
-        if hasattr(obj, "owner") and obj.owner == request.user:
+            return user.is_authenticated
+        if user.is_staff:
             return True
-        if request.user and request.user.is_staff:
-            return True
-        return False
+        # Compare owner_id so the check never fetches the owning User row;
+        # objects without an owner (e.g. GIS layers) are left to staff
+        return user.is_authenticated and getattr(obj, "owner_id", None) == user.pk
+
+
+def _user_sites(request: Optional[Request]) -> QuerySet[Site]:
+    """Sites the requesting user may filter images by (all of them for staff)."""
+    if request is None or not request.user.is_authenticated:
+        return Site.objects.none()
+    if request.user.is_staff:
+        return Site.objects.all()
+    return Site.objects.filter(owner_id=request.user.pk)
 
 
 class SatelliteImageFilter(FilterSet):
@@ -52,7 +75,7 @@ class SatelliteImageFilter(FilterSet):
         help_text="Filter images by capture date range.",
     )
     site = filters.ModelChoiceFilter(
-        queryset=Site.objects.all(),
+        queryset=_user_sites,
         label="Site",
         help_text="Filter images by associated site.",
     )
@@ -69,13 +92,99 @@ class SatelliteImageFilter(FilterSet):
         }
 
 
+# Decimal places for API GeoJSON coordinates; 6 is ~0.1 m at the equator and
+# trims the coordinate text by about a quarter compared to the default of 8
+_GEOJSON_PRECISION = 6
+
+# Rows fetched per server-side cursor round trip when streaming detections
+_DETECTION_STREAM_CHUNK_SIZE = 2000
+
+
+def _detection_feature(**properties: Any) -> JSONObject:
+    """Build a Detection GeoJSON Feature as jsonb in PostgreSQL.
+
+    Skips the GEOS -> text -> dict -> JSON round trip per row in Python.
+    """
+    return JSONObject(
+        type=Value("Feature"),
+        geometry=Cast(AsGeoJSON("location", precision=_GEOJSON_PRECISION), JSONField()),
+        properties=JSONObject(**properties),
+    )
+
+
+# Mapbox vector tile of site boundaries for one z/x/y tile. PostGIS clips and
+# encodes the geometries, so nothing is hydrated or serialized in Python.
+_SITE_TILE_SQL = f"""
+    WITH bounds AS (SELECT ST_TileEnvelope(%s, %s, %s) AS geom)
+    SELECT ST_AsMVT(tile, 'sites', 4096, 'geom')
+    FROM (
+        SELECT s.id, s.name,
+               ST_AsMVTGeom(ST_Transform(s.boundary, 3857), bounds.geom) AS geom
+        FROM {Site._meta.db_table} AS s, bounds
+        WHERE s.boundary && ST_Transform(bounds.geom, 4326)
+    ) AS tile
+"""
+
+
+class MVTRenderer(BaseRenderer):
+    """Pass Mapbox vector tile bytes through; JSON-encode anything else (errors)."""
+
+    media_type = "application/vnd.mapbox-vector-tile"
+    format = "mvt"
+    charset = None
+    render_style = "binary"
+
+    def render(
+        self: "MVTRenderer",
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[dict] = None,
+    ) -> bytes:
+        """Return tile bytes unchanged."""
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return bytes(data)
+        return JSONRenderer().render(data, renderer_context=renderer_context)
+
+
+class SatelliteImageCursorPagination(CursorPagination):
+    """Cursor pagination over a site's images, newest capture first.
+
+    Pages are fetched with a WHERE on the last seen date_captured (ties on it
+    are skipped with a small offset) rather than a growing OFFSET, so deep
+    pages cost about the same as the first one. id only makes the order stable.
+    """
+
+    ordering = ("-date_captured", "-id")
+
+
 class SiteViewSet(viewsets.ModelViewSet):
     """ViewSet for managing Site instances."""
 
-    queryset = Site.objects.all()
+    # SiteSerializer.owner_username reads owner.username for every row
+    queryset = Site.objects.all().select_related("owner")
     serializer_class = SiteSerializer
     permission_classes = [permissions.IsAuthenticated, IsSiteOwnerOrAdmin]
 
+    def get_queryset(self: "SiteViewSet") -> QuerySet[Site]:
+        """Render boundaries as GeoJSON in SQL for read-only actions."""
+        queryset = super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            # SiteSerializer's boundary field uses the annotation, so the raw
+            # geometry never has to be loaded, and of the owner only the
+            # username is read
+            queryset = queryset.annotate(
+                boundary_geojson=AsGeoJSON("boundary", precision=_GEOJSON_PRECISION)
+            ).only(
+                "id",
+                "name",
+                "owner",
+                "metadata",
+                "created_at",
+                "updated_at",
+                "owner__username",
+            )
+        return queryset
+
     def perform_create(self: "SiteViewSet", serializer: SiteSerializer) -> None:
         """Set the owner of the site to the requesting user upon creation."""
         serializer.save(owner=self.request.user)
@@ -85,13 +194,38 @@ class SiteViewSet(viewsets.ModelViewSet):
     )
     def gis_layers(self: "SiteViewSet", request: Request, pk: int = None) -> Response:
         """Retrieve GIS layers associated with a specific site."""
-        site = get_object_or_404(Site, pk=pk)
-        gis_layers = site.gis_layers.all()
+        # Query the layers directly; the site lookup is only needed to tell an
+        # unknown site (404) apart from one without layers
+        gis_layers = list(GISLayer.objects.filter(site_id=pk))
+        if not gis_layers and not Site.objects.filter(pk=pk).exists():
+            raise Http404("No Site matches the given query.")
         serializer = GISLayerSerializer(
             gis_layers, many=True, context={"request": request}
         )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"tiles/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)\.mvt",
+        renderer_classes=[MVTRenderer],
+    )
+    def tiles(
+        self: "SiteViewSet", request: Request, z: str, x: str, y: str
+    ) -> Response:
+        """Return site boundaries in one web-mercator tile as a vector tile.
+
+        Map clients showing many sites should use this instead of the GeoJSON
+        list; the protobuf tile is clipped to the tile and far smaller.
+        """
+        z, x, y = int(z), int(x), int(y)
+        if z > 30 or x >= 2**z or y >= 2**z:
+            raise Http404("Tile coordinates out of range.")
+        with connection.cursor() as cursor:
+            cursor.execute(_SITE_TILE_SQL, [z, x, y])
+            tile = cursor.fetchone()[0]
+        return Response(bytes(tile or b""))
+
     @action(
         detail=True,
         methods=["post"],
@@ -102,29 +236,55 @@ class SiteViewSet(viewsets.ModelViewSet):
         self: "SiteViewSet", request: Request, pk: int = None
     ) -> Response:
         """Fetch Sentinel-2 imagery for the site within a specified date range."""
-        site = get_object_or_404(Site, pk=pk)
-        start_date_str = request.data.get("start_date")
-        end_date_str = request.data.get("end_date")
+        # get_object() loads the site once and runs IsSiteOwnerOrAdmin on it
+        site = self.get_object()
+        # Reject bad ranges here rather than in a retrying worker
+        serializer = FetchImagerySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        fetch_sentinel2_imagery.delay(
+            site.id,
+            serializer.validated_data["start_date"].isoformat(),
+            serializer.validated_data["end_date"].isoformat(),
+        )
 
-        if not start_date_str or not end_date_str:
-            return Response(
-                {"error": "Both start_date and end_date are required."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        return Response(
+            {"message": "Imagery fetch initiated successfully."},
+            status=status.HTTP_202_ACCEPTED,
+        )
 
-        try:
-            datetime.fromisoformat(start_date_str)
-            datetime.fromisoformat(end_date_str)
-        except ValueError:
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-fetch-imagery",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def bulk_fetch_imagery(self: "SiteViewSet", request: Request) -> Response:
+        """Fetch Sentinel-2 imagery for several sites in one broker round trip."""
+        serializer = BulkFetchImagerySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        site_ids = set(serializer.validated_data["site_ids"])
+
+        sites = Site.objects.filter(pk__in=site_ids)
+        if not request.user.is_staff:
+            sites = sites.filter(owner_id=request.user.pk)
+        found = set(sites.values_list("pk", flat=True))
+        if found != site_ids:
             return Response(
-                {"error": "Invalid date format. Use YYYY-MM-DD."},
+                {"site_ids": sorted(site_ids - found)},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        fetch_sentinel2_imagery.delay(site.id, start_date_str, end_date_str)
+        start_date = serializer.validated_data["start_date"].isoformat()
+        end_date = serializer.validated_data["end_date"].isoformat()
+        # One group publishes every task together instead of a .delay() each
+        group(
+            fetch_sentinel2_imagery.s(site_id, start_date, end_date)
+            for site_id in sorted(found)
+        ).apply_async()
 
         return Response(
-            {"message": "Imagery fetch initiated successfully."},
+            {"message": f"Imagery fetch initiated for {len(found)} sites."},
             status=status.HTTP_202_ACCEPTED,
         )
 
@@ -145,9 +305,10 @@ class GISLayerViewSet(viewsets.ModelViewSet):
         queryset = super().get_queryset()
         site_pk = self.kwargs.get("site_pk")
         if site_pk:
-            queryset = queryset.filter(site__id=site_pk)
+            # site_id is the layer's own column, no join needed
+            queryset = queryset.filter(site_id=site_pk)
         if self.request.user.is_authenticated:
-            queryset = queryset.filter(site__owner=self.request.user)
+            queryset = queryset.filter(site__owner_id=self.request.user.pk)
         return queryset
 
 
@@ -156,19 +317,69 @@ class SatelliteImageViewSet(viewsets.ReadOnlyModelViewSet):
 
     serializer_class = SatelliteImageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = SatelliteImageCursorPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = SatelliteImageFilter
 
+    def include_detections(self: "SatelliteImageViewSet") -> bool:
+        """Whether detection_data is serialized for this request.
+
+        Lists only embed detections with ?include=detections; single images
+        always do, and other actions never serialize them.
+        """
+        if self.action == "retrieve":
+            return True
+        if self.action != "list":
+            return False
+        includes = {
+            name.strip()
+            for value in self.request.query_params.getlist("include")
+            for name in value.split(",")
+        }
+        return "detections" in includes
+
+    def get_serializer_context(self: "SatelliteImageViewSet") -> dict:
+        """Tell SatelliteImageSerializer whether to embed detections."""
+        context = super().get_serializer_context()
+        context["include_detections"] = self.include_detections()
+        return context
+
     def get_queryset(self: "SatelliteImageViewSet") -> QuerySet:
         """Return SatelliteImages filtered by site_pk in the URL."""
         site_pk = self.kwargs.get("site_pk")
         if site_pk is None:
             return SatelliteImage.objects.none()
-        return SatelliteImage.objects.filter(site__pk=site_pk).select_related("site")
+        # Only site.name is serialized, so skip the site's polygon and JSON
+        queryset = (
+            SatelliteImage.objects.filter(site__pk=site_pk)
+            .select_related("site")
+            .defer("site__boundary", "site__metadata")
+        )
+        if self.include_detections():
+            # detection_data serializes every image's detections; prefetching
+            # sets each detection's satellite_image (and its site) as well
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "detections",
+                    queryset=Detection.objects.annotate(
+                        location_geojson=AsGeoJSON("location")
+                    ).defer("location"),
+                )
+            )
+        if self.action in ("list", "retrieve"):
+            # Footprints are rendered to GeoJSON by PostGIS; see
+            # AnnotatedGeometryField
+            queryset = queryset.annotate(
+                footprint_geojson=AsGeoJSON("footprint", precision=_GEOJSON_PRECISION)
+            ).defer("footprint")
+        elif self.action == "run_detection":
+            # Only the image id and the site's owner are read before dispatch
+            queryset = queryset.only("id", "site__owner")
+        return queryset
 
     @action(
         detail=True,
-        methods=["get"],
+        methods=["post"],
         url_path="run-detection",
         permission_classes=[permissions.IsAuthenticated],
     )
@@ -188,11 +399,13 @@ class SatelliteImageViewSet(viewsets.ReadOnlyModelViewSet):
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        satellite_image = get_object_or_404(
-            SatelliteImage, pk=pk, site__pk=self.kwargs.get("site_pk")
-        )
+        # get_queryset() already scopes to site_pk and joins the site
+        satellite_image = self.get_object()
 
-        if not request.user.is_staff and satellite_image.site.owner != request.user:
+        if (
+            not request.user.is_staff
+            and satellite_image.site.owner_id != request.user.pk
+        ):
             return Response(
                 {"detail": "Permission denied."}, status=status.HTTP_403_FORBIDDEN
             )
@@ -215,57 +428,84 @@ class SatelliteImageViewSet(viewsets.ReadOnlyModelViewSet):
         request: Request,
         pk: int = None,
         site_pk: int = None,
-    ) -> Response:
+    ) -> Response | HttpResponse:
         """Retrieve detections for a SatelliteImage in GeoJSON format."""
-        satellite_image = get_object_or_404(SatelliteImage, pk=pk, site__pk=site_pk)
-        detections = satellite_image.detections.all()
+        satellite_image = get_object_or_404(
+            SatelliteImage.objects.select_related("site").only(
+                "id", "site__name", "site__owner"
+            ),
+            pk=pk,
+            site__pk=site_pk,
+        )
 
-        if not request.user.is_staff and satellite_image.site.owner != request.user:
+        if (
+            not request.user.is_staff
+            and satellite_image.site.owner_id != request.user.pk
+        ):
             return Response(
                 {"detail": "Permission denied."}, status=status.HTTP_403_FORBIDDEN
             )
-        features = []
-        for det in detections:
-            if det.location:
-                feature = {
-                    "type": "Feature",
-                    "geometry": json.loads(det.location.geojson),
-                    "properties": {
-                        "detected_class": det.detected_class,
-                        "confidence": det.confidence,
-                        "timestamp": det.timestamp.isoformat(),
-                        "metadata": det.metadata,
-                        "satellite_image_id": satellite_image.id,
-                        "site_name": satellite_image.site.name,
-                        "bbox_pixels": det.coordinates,
-                    },
-                }
-                features.append(feature)
-
-            geojson_data = {"type": "FeatureCollection", "features": features}
-            return Response(geojson_data)
-
-    @action(
-        detail=False,
-        methods=["get"],
-        url_path="all-detections-geojson",
-        permission_classes=[permissions.IsAuthenticated],
-    )
+        cache_key = detections_geojson_cache_key(satellite_image.id)
+        cached = cache.get(cache_key)
+        if cached is None:
+            # PostGIS builds and aggregates the features; the text goes out as is
+            aggregated = satellite_image.detections.filter(
+                location__isnull=False
+            ).aggregate(
+                features=Cast(
+                    JSONBAgg(
+                        _detection_feature(
+                            detected_class=F("detected_class"),
+                            confidence=F("confidence"),
+                            timestamp=F("timestamp"),
+                            metadata=F("metadata"),
+                            satellite_image_id=Value(satellite_image.id),
+                            site_name=Value(satellite_image.site.name),
+                            bbox_pixels=F("coordinates"),
+                        ),
+                        order_by="-timestamp",
+                    ),
+                    TextField(),
+                )
+            )
+            features = aggregated["features"] or "[]"
+            body = f'{{"type":"FeatureCollection","features":{features}}}'
+            digest = hashlib.md5(body.encode(), usedforsecurity=False).hexdigest()
+            etag = f'"{digest}"'
+            # Invalidated by process_image_detections when detections change
+            cached = (etag, body)
+            cache.set(
+                cache_key,
+                cached,
+                getattr(settings, "DETECTIONS_GEOJSON_CACHE_TTL", 60 * 5),
+            )
+        etag, body = cached
+        # The permission check above runs on every request, so the cached
+        # body is shared between users allowed to see the image
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        response = HttpResponse(body, content_type="application/geo+json")
+        response["ETag"] = etag
+        return response
+
+    # Not an @action: the router would also mount it under images/, so
+    # core/urls.py maps it once at sites/<site_pk>/all-detections-geojson/
     def all_detections_geojson(
         self: "SatelliteImageViewSet", request: Request, site_pk: int = None
-    ) -> Response:
-        """Return a GeoJSON FeatureCollection of all detections for a site."""
-        site = get_object_or_404(Site, pk=site_pk)
-        queryset = Detection.objects.filter(satellite_image__site=site).select_related(
-            "satellite_image__site"
+    ) -> Response | StreamingHttpResponse:
+        """Stream a GeoJSON FeatureCollection of all detections for a site."""
+        site = get_object_or_404(
+            Site.objects.only("id", "name", "updated_at"), pk=site_pk
         )
+        queryset = Detection.objects.filter(satellite_image__site=site)
         date_after_str = request.query_params.get("date_after")
         date_before_str = request.query_params.get("date_before")
 
         if date_after_str:
             try:
                 date_after = datetime.fromisoformat(date_after_str).replace(
-                    tzinfo=pytz.utc
+                    tzinfo=timezone.utc
                 )
                 queryset = queryset.filter(timestamp__gte=date_after)
             except ValueError:
@@ -277,7 +517,7 @@ class SatelliteImageViewSet(viewsets.ReadOnlyModelViewSet):
         if date_before_str:
             try:
                 date_before = datetime.fromisoformat(date_before_str).replace(
-                    tzinfo=pytz.utc
+                    tzinfo=timezone.utc
                 )
                 queryset = queryset.filter(timestamp__lte=date_before)
             except ValueError:
@@ -286,23 +526,45 @@ class SatelliteImageViewSet(viewsets.ReadOnlyModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-        features = []
-        for det in queryset:
-            if det.location:
-                feature = {
-                    "type": "Feature",
-                    "geometry": json.loads(det.location.geojson),
-                    "properties": {
-                        "id": det.id,
-                        "detected_class": det.detected_class,
-                        "confidence": det.confidence,
-                        "timestamp": det.timestamp.isoformat(),
-                        "satellite_image_id": det.satellite_image.id,
-                        "site_name": det.satellite_image.site.name,
-                        "bbox_pixels": det.location,
-                    },
-                }
-                features.append(feature)
-
-        geojson_data = {"type": "FeatureCollection", "features": features}
-        return Response(geojson_data)
+        queryset = queryset.filter(location__isnull=False)
+        # One aggregate tells whether the client's copy is still current; the
+        # count and newest id change on inserts and deletes, updated_at on
+        # a site rename. No Last-Modified is sent: Detection.timestamp is the
+        # inference time, not when a row was written or deleted.
+        stats = queryset.aggregate(count=Count("id"), latest_id=Max("id"))
+        etag = (
+            f'"{site.pk}-{site.updated_at.timestamp()}-'
+            f'{stats["count"]}-{stats["latest_id"]}"'
+        )
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        features = queryset.annotate(
+            feature=Cast(
+                _detection_feature(
+                    id=F("id"),
+                    detected_class=F("detected_class"),
+                    confidence=F("confidence"),
+                    timestamp=F("timestamp"),
+                    satellite_image_id=F("satellite_image_id"),
+                    site_name=Value(site.name),
+                    bbox_pixels=F("coordinates"),
+                ),
+                TextField(),
+            )
+        ).values_list("feature", flat=True)
+
+        def stream() -> Iterator[bytes]:
+            """Yield the FeatureCollection one PostGIS-built feature at a time."""
+            yield b'{"type":"FeatureCollection","features":['
+            separator = b""
+            for feature in features.iterator(chunk_size=_DETECTION_STREAM_CHUNK_SIZE):
+                yield separator + feature.encode()
+                separator = b","
+            yield b"]}"
+
+        # Memory stays bounded by the iterator chunk, however many rows match
+        response = StreamingHttpResponse(stream(), content_type="application/geo+json")
+        response["ETag"] = etag
+        return response
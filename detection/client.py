@@ -1,17 +1,45 @@
 """Client for the AI microservice in the detection application."""
 
-import json
+import logging
 import random
 import time
-from datetime import datetime  # Removed timedelta
+from datetime import datetime, timezone  # Removed timedelta
 from typing import Any, Dict, List, Optional
 
-import pytz
+import orjson
 from django.conf import settings
 from django.contrib.gis.geos import GEOSGeometry, Point
+from django.core.cache import cache
+
+from Jadwak.http import pooled_session
 
 # from django.utils import timezone as django_timezone  # Removed: F401 unused import
 
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the AI microservice before giving up on a request
+_REQUEST_TIMEOUT = 30
+
+# Object classes the mock service detects
+_MOCK_CLASSES = ("EXCAVATOR", "CRANE", "TRUCK", "GRADER", "BULLDOZER")
+_MOCK_MODEL_VERSION = "YOLOv8-Mock-v1.0"
+
+# Consecutive failed requests after which the circuit breaker opens, and the
+# seconds it stays open before requests are let through to the service again
+_BREAKER_FAIL_MAX = 5
+_BREAKER_RESET_TIMEOUT = 60
+# Seconds a failure keeps counting towards opening the breaker
+_BREAKER_FAILURE_WINDOW = 600
+
+
+class AIServiceUnavailable(Exception):
+    """Raised without calling the AI microservice while its circuit breaker is open."""
+
+    def __init__(self: "AIServiceUnavailable", base_url: str, retry_after: int) -> None:
+        """Record the service and the seconds until it is called again."""
+        super().__init__(f"AI microservice {base_url} is unavailable.")
+        self.retry_after = retry_after
+
 
 class AIMicroserviceClient:
     """Client for interacting with the AI microservice.
@@ -29,6 +57,46 @@ class AIMicroserviceClient:
         )
         # In a real scenario:
         # self.headers = {"Authorization": f"Bearer {settings.AI_SERVICE_API_KEY}"}
+        # Mock detections are returned until a real service is configured
+        self.mock = getattr(settings, "AI_MICROSERVICE_MOCK", True)
+
+    def _breaker_key(self: "AIMicroserviceClient", name: str) -> str:
+        """Build a circuit breaker cache key, shared by all workers per service."""
+        return f"ai_breaker:{name}:{self.base_url}"
+
+    def _post(self: "AIMicroserviceClient", url: str, payload: Dict[str, Any]) -> Any:
+        """POST a JSON payload to the AI microservice through its circuit breaker.
+
+        While the breaker is open, AIServiceUnavailable is raised without a
+        request. Once it closes, a failure re-opens it straight away (the
+        failure count is kept), and a success resets the count.
+        """
+        import requests
+
+        if cache.get(self._breaker_key("open")):
+            raise AIServiceUnavailable(self.base_url, _BREAKER_RESET_TIMEOUT)
+        failures_key = self._breaker_key("failures")
+        try:
+            response = pooled_session().post(
+                url, json=payload, timeout=_REQUEST_TIMEOUT
+            )
+            response.raise_for_status()
+        except requests.RequestException:
+            cache.add(failures_key, 0, _BREAKER_FAILURE_WINDOW)
+            try:
+                failures = cache.incr(failures_key)
+            except ValueError:
+                # The counter expired or was evicted since add(); restart it
+                failures = 1
+                cache.set(failures_key, failures, _BREAKER_FAILURE_WINDOW)
+            if failures >= _BREAKER_FAIL_MAX:
+                cache.set(self._breaker_key("open"), True, _BREAKER_RESET_TIMEOUT)
+                logger.warning(
+                    "Circuit breaker opened for AI microservice %s.", self.base_url
+                )
+            raise
+        cache.delete(failures_key)
+        return response.json()
 
     def send_image_for_inference(
         self: "AIMicroserviceClient",
@@ -36,47 +104,72 @@ class AIMicroserviceClient:
     ) -> List[Dict[str, Any]]:
         """Send an image URL to the AI microservice for inference.
 
-        This method simulates sending an image and receiving detection results.
+        Unless AI_MICROSERVICE_MOCK is off, this simulates sending an image and
+        receiving detection results.
         """
-        print(f"Sending image {image_url} for inference to {self.base_url}")
+        logger.debug("Sending image %s for inference to %s", image_url, self.base_url)
+        if not self.mock:
+            return self._post(self.base_url, {"image_url": image_url})
 
         # Simulate network delay
         time.sleep(random.uniform(0.5, 2.0))
-        detected_objects: List[Dict[str, Any]] = []
-        num_detections = random.randint(0, 5)
+        return self._mock_detections()
+
+    def send_images_for_inference(
+        self: "AIMicroserviceClient",
+        image_urls: List[str],
+    ) -> List[List[Dict[str, Any]]]:
+        """Send several image URLs to the AI microservice in one request.
+
+        Returns one list of detections per image, in the order given.
+        """
+        logger.debug(
+            "Sending %d images for inference to %s", len(image_urls), self.base_url
+        )
+        if not self.mock:
+            return self._post(
+                f"{self.base_url.rstrip('/')}/batch", {"images": image_urls}
+            )["results"]
+
+        # Simulate a single network round trip for the whole batch
+        time.sleep(random.uniform(0.5, 2.0))
+        return [self._mock_detections() for _ in image_urls]
+
+    def _mock_detections(self: "AIMicroserviceClient") -> List[Dict[str, Any]]:
+        """Generate random detections in the AI microservice's response format."""
+        uniform = random.uniform
+        randint = random.randint
+        num_detections = randint(0, 5)
+        # One response carries one inference time for all of its detections
+        timestamp_utc = datetime.now(timezone.utc).isoformat()
 
         # Simulate detections
+        detected_objects: List[Dict[str, Any]] = []
         for _ in range(num_detections):
-            detected_class = random.choice(
-                ["EXCAVATOR", "CRANE", "TRUCK", "GRADER", "BULLDOZER"]
+            # Simulate bounding box coordinates (pixel values)
+            x1 = randint(0, 800)
+            y1 = randint(0, 800)
+            detected_objects.append(
+                {
+                    "class": random.choice(_MOCK_CLASSES),
+                    "confidence": round(uniform(0.6, 0.99), 2),
+                    "bbox_pixels": [
+                        x1,
+                        y1,
+                        x1 + randint(50, 200),
+                        y1 + randint(50, 200),
+                    ],
+                    # GeoJSON Point, built directly rather than via GEOS
+                    "geo_location": {
+                        "type": "Point",
+                        "coordinates": [uniform(36.7, 36.9), uniform(-1.35, -1.2)],
+                    },
+                    "timestamp_utc": timestamp_utc,
+                    "model_version": _MOCK_MODEL_VERSION,
+                }
             )
-            confidence = round(random.uniform(0.6, 0.99), 2)
 
-            # Simulate bounding box coordinates (pixel values)
-            x1 = random.randint(0, 800)
-            y1 = random.randint(0, 800)
-            x2 = x1 + random.randint(50, 200)
-            y2 = y1 + random.randint(50, 200)
-            bbox_pixels = [x1, y1, x2, y2]
-
-            # Simulate a geographic location (Point) for the detection
-            mock_lon = random.uniform(36.7, 36.9)
-            mock_lat = random.uniform(-1.35, -1.2)
-            location_point = Point(mock_lon, mock_lat, srid=4326)
-
-            detection_result = {
-                "class": detected_class,
-                "confidence": confidence,
-                "bbox_pixels": bbox_pixels,
-                "geo_location": json.loads(
-                    location_point.geojson
-                ),  # GeoJSON representation
-                "timestamp_utc": pytz.utc.localize(datetime.now()).isoformat(),
-                "model_version": "YOLOv8-Mock-v1.0",
-            }
-            detected_objects.append(detection_result)
-
-        print(f"MOCK AI Service: Detected {num_detections} objects.")
+        logger.debug("MOCK AI Service: Detected %d objects.", num_detections)
         return detected_objects
 
     def parse_ai_response(
@@ -87,40 +180,37 @@ class AIMicroserviceClient:
         confidence = raw_detection_data.get("confidence", 0.0)
         bbox_pixels_from_raw = raw_detection_data.get("bbox_pixels", [])
 
-        geo_location_geojson = json.dumps(raw_detection_data.get("geo_location", {}))
-        location = GEOSGeometry(geo_location_geojson, srid=4326)
+        geo_location = raw_detection_data.get("geo_location", {})
+        if geo_location.get("type") == "Point":
+            # The service reports Points; build them without a GeoJSON round trip
+            location = Point(*geo_location["coordinates"], srid=4326)
+        else:
+            location = GEOSGeometry(orjson.dumps(geo_location).decode(), srid=4326)
 
-        timestamp_str = raw_detection_data.get(
-            "timestamp_utc",
-            pytz.utc.localize(
-                datetime.now()
-            ).isoformat(),  # Corrected default to timezone-aware datetime
-        )
+        # A missing or unparsable timestamp falls back to a single "now" below
+        timestamp_str = raw_detection_data.get("timestamp_utc")
         timestamp = None
 
         if timestamp_str:
             try:
                 parsed_dt = datetime.fromisoformat(timestamp_str)
-                if (
-                    parsed_dt.tzinfo is not None
-                    and parsed_dt.tzinfo.utcoffset(parsed_dt) is not None
-                ):
-                    timestamp = parsed_dt.astimezone(pytz.utc)
-                else:
-                    timestamp = pytz.utc.localize(parsed_dt)
-
             except ValueError:
-                print(
-                    f"Warning: Could not parse timestamp '{timestamp_str}'. "
-                    "Falling back to current UTC time."
+                logger.warning(
+                    "Could not parse timestamp '%s'. Falling back to current UTC time.",
+                    timestamp_str,
                 )
+            else:
+                # UTC has no DST rules, so replace() is enough for naive values
+                if parsed_dt.utcoffset() is not None:
+                    timestamp = parsed_dt.astimezone(timezone.utc)
+                else:
+                    timestamp = parsed_dt.replace(tzinfo=timezone.utc)
 
-                timestamp = pytz.utc.localize(datetime.now())
-
-        else:
-            timestamp = pytz.utc.localize(datetime.now())
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc)
 
-        metadata_dict = raw_detection_data.copy()
+        # The raw result is only stored, never mutated, so no copy is needed
+        metadata_dict = raw_detection_data
 
         return {
             "detected_class": detected_class,
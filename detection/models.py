@@ -1,10 +1,24 @@
 """models for the detection app."""
 from django.contrib.gis.db import models
+from django.contrib.postgres.indexes import SpGistIndex
+from django.core.exceptions import ValidationError
 
 # from django.utils import timezone # Removed: F401 unused import
 from core.models import SatelliteImage, Site
 
 
+def validate_bbox_list(value: object) -> None:
+    """Validate a bounding box as four non-negative ints [x1, y1, x2, y2]."""
+    if not (
+        isinstance(value, list)
+        and len(value) == 4
+        and all(type(v) is int and v >= 0 for v in value)
+    ):
+        raise ValidationError(
+            "Bounding box must be a list of four non-negative integers."
+        )
+
+
 # Create your models here.
 class Detection(models.Model):
     """Model representing a detection made on a satellite image."""
@@ -13,6 +27,8 @@ class Detection(models.Model):
         SatelliteImage,
         on_delete=models.CASCADE,
         related_name="detections",
+        # det_image_timestamp_idx leads with satellite_image and serves FK lookups
+        db_index=False,
         help_text="The satellite image on which the detection was made.",
     )
 
@@ -26,11 +42,15 @@ class Detection(models.Model):
     )
 
     coordinates = models.JSONField(
-        help_text="Bounding box coordinates in image pixel space [x1, y1, x2, y2]"
+        validators=[validate_bbox_list],
+        help_text="Bounding box coordinates in image pixel space [x1, y1, x2, y2]",
     )
 
     location = models.PointField(
-        srid=4326, help_text="Geospatial location of the detection (WGS84)."
+        srid=4326,
+        # Indexed with SP-GiST in Meta.indexes instead of the default GiST
+        spatial_index=False,
+        help_text="Geospatial location of the detection (WGS84).",
     )
 
     timestamp = models.DateTimeField(
@@ -50,6 +70,18 @@ class Detection(models.Model):
         verbose_name = "Detection"
         verbose_name_plural = "Detections"
         ordering = ["-timestamp"]
+        indexes = [
+            # Per-image detections newest first, and timestamp ranges per image
+            models.Index(
+                fields=["satellite_image", "-timestamp"],
+                name="det_image_timestamp_idx",
+            ),
+            # Also serves the cursor pagination ORDER BY (timestamp, id) of DetectionViewSet
+            models.Index(fields=["timestamp", "id"], name="det_timestamp_idx"),
+            # SP-GiST (spgist_geometry_ops_2d) suits points and is smaller
+            # than GiST, so it stays cached as the table grows
+            SpGistIndex(fields=["location"], name="det_loc_spgist"),
+        ]
 
     def __str__(self: "Detection") -> str:
         """Return string representation of the Detection model."""
@@ -120,6 +152,10 @@ class ChangeLog(models.Model):
         verbose_name = "Change Log"
         verbose_name_plural = "Change Logs"
         ordering = ["-timestamp"]  # Order by most recent change
+        indexes = [
+            # Serves the cursor pagination ORDER BY (timestamp, id) of ChangeLogViewSet
+            models.Index(fields=["timestamp", "id"], name="changelog_timestamp_idx"),
+        ]
 
     def __str__(self: "ChangeLog") -> str:
         """Return string representation of the ChangeLog model."""
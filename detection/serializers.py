@@ -1,15 +1,31 @@
 """Serializers for the detection app."""
 
-import json  # Required for json.loads in get_geojson_location
+import orjson  # Required for orjson.loads in get_geojson_location
 from rest_framework import serializers
 
+from core.fields import AnnotatedGeometryField
+
 from .models import Detection, ChangeLog  # Import both models
 
 
+class BBoxField(serializers.ListField):
+    """Bounding box in image pixel space, exactly four ints [x1, y1, x2, y2]."""
+
+    child = serializers.IntegerField(min_value=0)
+
+    def __init__(self: "BBoxField", **kwargs: object) -> None:
+        """Fix the length at four; ListField resets class-level length bounds."""
+        kwargs.setdefault("min_length", 4)
+        kwargs.setdefault("max_length", 4)
+        super().__init__(**kwargs)
+
+
 class DetectionSerializer(serializers.ModelSerializer):
     """Serializer for the Detection model.
 
     Outputs 'location' as a GeoJSON Point Feature via 'geojson_location' field.
+    Both read the location_geojson annotation (AsGeoJSON) when the queryset
+    has it, so the location column can be deferred and never hydrated by GEOS.
     """
 
     satellite_image_id = serializers.ReadOnlyField(source="satellite_image.id")
@@ -17,7 +33,8 @@ class DetectionSerializer(serializers.ModelSerializer):
 
     # SerializerMethodField to output location as GeoJSON
     geojson_location = serializers.SerializerMethodField()
-    coordinates = serializers.JSONField()
+    location = AnnotatedGeometryField()
+    coordinates = BBoxField()
 
     class Meta:
         """Meta class for DetectionSerializer."""
@@ -42,11 +59,17 @@ class DetectionSerializer(serializers.ModelSerializer):
     def get_geojson_location(
         self: "DetectionSerializer", obj: Detection
     ) -> dict | None:
-        """Return the location PointField as a GeoJSON dictionary."""
+        """Return the location PointField as a GeoJSON dictionary.
+
+        Uses the location_geojson annotation when the queryset has it, falling
+        back to the GEOS geometry otherwise.
+        """
+        location_geojson = getattr(obj, "location_geojson", None)
+        if location_geojson is not None:
+            return orjson.loads(location_geojson)
         if obj.location:
-            # Assuming obj.location is a GEOSGeometry object that has a .geojson property
-            # which returns a JSON string.
-            return json.loads(obj.location.geojson)
+            # obj.location is a GEOSGeometry whose .geojson is a JSON string
+            return orjson.loads(obj.location.geojson)
         return None
 
 
@@ -1,11 +1,16 @@
 """Celery tasks for processing satellite imagery and detecting changes."""
 
+import functools
+import logging
 import random
+from collections import Counter
+from typing import Optional
 
 from celery import shared_task
 from celery.app.task import Task  # Import Task for type hinting 'self'
+from django.core.cache import cache
 from django.db import transaction
-from django.shortcuts import get_object_or_404
+from django.db.models import Count
 
 
 # Import models
@@ -14,109 +19,305 @@ from detection.models import Detection, ChangeLog
 from alerts.tasks import generate_alerts
 
 
-from detection.client import AIMicroserviceClient
+from detection.client import AIMicroserviceClient, AIServiceUnavailable
 
+logger = logging.getLogger(__name__)
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+
+# Rows per INSERT when storing an image's detections
+_BULK_CREATE_BATCH_SIZE = 500
+
+# Seconds change detection waits so images of one site processed close
+# together are compared in a single run
+_CHANGE_DETECTION_DELAY = 30
+
+# Retry delays are drawn at random below a bound that doubles from the base
+# up to the cap, so workers failing together do not retry together
+_RETRY_BACKOFF_BASE = 60
+_RETRY_BACKOFF_MAX = 600
+# Upper bound of the random seconds added to an open circuit breaker's reset
+# timeout, so queued tasks do not all probe the AI service at once
+_BREAKER_RETRY_JITTER = 30
+
+
+@functools.lru_cache(maxsize=None)
+def _ai_client() -> AIMicroserviceClient:
+    """Return this worker process's shared AIMicroserviceClient."""
+    return AIMicroserviceClient()
+
+
+def detections_geojson_cache_key(satellite_image_id: int) -> str:
+    """Build the cache key for an image's detections FeatureCollection."""
+    return f"detections_geojson:{satellite_image_id}"
+
+
+def _change_detection_pending_key(site_id: int) -> str:
+    """Build the cache key marking a site's change detection as scheduled."""
+    return f"changedet:pending:{site_id}"
+
+
+def _schedule_change_detection(site_id: int) -> None:
+    """Schedule detect_site_changes for a site unless a run is already pending.
+
+    The first processed image schedules a delayed run; images finishing before
+    it starts are picked up by that run instead of queueing their own.
+    """
+    if cache.add(
+        _change_detection_pending_key(site_id), True, _CHANGE_DETECTION_DELAY * 2
+    ):
+        detect_site_changes.apply_async(
+            kwargs={"site_id": site_id}, countdown=_CHANGE_DETECTION_DELAY
+        )
+
+
+def _retry_countdown(task: Task) -> float:
+    """Return a fully jittered exponential backoff delay for a task's next retry."""
+    return random.uniform(
+        0, min(_RETRY_BACKOFF_MAX, _RETRY_BACKOFF_BASE * 2**task.request.retries)
+    )
+
+
+def _inference_image_url(satellite_image_id: int) -> str:
+    """Return the URL the AI microservice fetches an image from (mock storage)."""
+    return f"http://internal-storage.com/images/{satellite_image_id}.tiff"
+
+
+def _build_detections(
+    ai_client: AIMicroserviceClient,
+    satellite_image: SatelliteImage,
+    raw_detection_results: list,
+) -> list[Detection]:
+    """Turn one image's raw AI results into unsaved Detection instances."""
+    detections = []
+    if not raw_detection_results:
+        logger.info("No objects detected in SatelliteImage %s.", satellite_image.pk)
+    for raw_result in raw_detection_results or ():
+        # A malformed result is skipped without failing the rest of the batch
+        try:
+            parsed_data = ai_client.parse_ai_response(raw_result)
+        except Exception as e:
+            logger.warning(
+                "Error parsing detection for image %s: %s", satellite_image.pk, e
+            )
+            continue
+        detections.append(
+            Detection(
+                satellite_image=satellite_image,
+                detected_class=parsed_data["detected_class"],
+                coordinates=parsed_data["coordinates"],
+                confidence=parsed_data["confidence"],
+                location=parsed_data["location"],
+                timestamp=parsed_data["timestamp"],
+                metadata=parsed_data["metadata"],
+            )
+        )
+    return detections
+
+
+@shared_task(bind=True, max_retries=3)
 def process_image_detections(self: Task, satellite_image_id: int) -> str:
     """Celery task to send a SatelliteImage to the AI microservice for detection.
 
     Stores the results.
     """
     try:
-        satellite_image = get_object_or_404(SatelliteImage, id=satellite_image_id)
-        print(
-            f"Processing SatelliteImage: {satellite_image.pk} "
-            f"(Site: {satellite_image.site.name}) for AI detections."
+        # Only the key, the status and the site name (logged below) are
+        # needed, so neither the image's nor the site's other columns are
+        # fetched; .get() raises DoesNotExist, which aborts instead of retrying
+        satellite_image = (
+            SatelliteImage.objects.select_related("site")
+            .only("id", "status", "site", "site__name")
+            .get(id=satellite_image_id)
         )
-
-        ai_client = AIMicroserviceClient()
-        mock_image_url_for_ai = (
-            f"http://internal-storage.com/images/{satellite_image.pk}.tiff"
+        # A retry whose earlier attempt already committed has nothing left to
+        # do, so it neither repeats the inference nor stores it again
+        if self.request.retries and satellite_image.status == "PROCESSED":
+            logger.info(
+                "SatelliteImage %s was processed by an earlier attempt.",
+                satellite_image.pk,
+            )
+            return f"Image {satellite_image.pk} already processed."
+        logger.info(
+            "Processing SatelliteImage: %s (Site: %s) for AI detections.",
+            satellite_image.pk,
+            satellite_image.site.name,
         )
+
+        ai_client = _ai_client()
         raw_detection_results = ai_client.send_image_for_inference(
-            mock_image_url_for_ai
+            _inference_image_url(satellite_image.pk)
         )
 
-        detections_count = 0
-        if not raw_detection_results:
-            print(f"No objects detected in SatelliteImage {satellite_image.pk}.")
-        else:
-            for raw_result in raw_detection_results:
-                try:
-                    parsed_data = ai_client.parse_ai_response(raw_result)
-                    with transaction.atomic():
-                        Detection.objects.create(
-                            satellite_image=satellite_image,
-                            detected_class=parsed_data["detected_class"],
-                            coordinates=parsed_data["coordinates"],
-                            confidence=parsed_data["confidence"],
-                            location=parsed_data["location"],
-                            timestamp=parsed_data["timestamp"],
-                            metadata=parsed_data["metadata"],
-                        )
-                        detections_count += 1
-                        print(
-                            f"  - Created Detection: {parsed_data['detected_class']} "
-                            f"(Confidence: {parsed_data['confidence']})"
-                        )
-                except Exception as e:
-                    print(
-                        f"Error parsing/creating detection for image "
-                        f"{satellite_image.pk}: {e}"
-                    )
-                    continue
-
-        satellite_image.status = "PROCESSED"
-        satellite_image.save(update_fields=["status"])
-
-        print(
-            f"Successfully processed SatelliteImage {satellite_image.pk} and created "
-            f"{detections_count} detections. Triggering change detection."
-        )
-
-        # Calling the (now unified) detect_site_changes task
-        detect_site_changes.delay(
-            site_id=satellite_image.site.id, processed_image_id=satellite_image.pk
+        detections = _build_detections(
+            ai_client, satellite_image, raw_detection_results
+        )
+
+        # One multi-row INSERT and one commit for the image's detections. They
+        # replace any from an earlier run, so re-running an image is idempotent.
+        with transaction.atomic():
+            Detection.objects.filter(satellite_image_id=satellite_image.pk).delete()
+            Detection.objects.bulk_create(
+                detections, batch_size=_BULK_CREATE_BATCH_SIZE
+            )
+            SatelliteImage.objects.filter(pk=satellite_image.pk).update(
+                status="PROCESSED"
+            )
+        detections_count = len(detections)
+        # New detections make the cached GeoJSON for this image stale
+        cache.delete(detections_geojson_cache_key(satellite_image.pk))
+
+        logger.info(
+            "Successfully processed SatelliteImage %s and created %d detections. "
+            "Triggering change detection.",
+            satellite_image.pk,
+            detections_count,
         )
 
+        # Coalesced with other images of the site processed around the same time
+        _schedule_change_detection(satellite_image.site_id)
+
         return (
             f"Processed image {satellite_image.pk}: " f"{detections_count} detections."
         )
 
     except SatelliteImage.DoesNotExist:
-        print(
-            f"Error: SatelliteImage with ID {satellite_image_id} does not exist. "
-            "Aborting task."
+        logger.error(
+            "SatelliteImage with ID %s does not exist. Aborting task.",
+            satellite_image_id,
         )
         raise
 
+    except AIServiceUnavailable as e:
+        logger.warning("%s Retrying image %s later.", e, satellite_image_id)
+        self.retry(
+            exc=e,
+            countdown=e.retry_after + random.uniform(0, _BREAKER_RETRY_JITTER),
+        )
+
+    except Exception as e:
+        logger.exception(
+            "An unexpected error occurred processing image %s", satellite_image_id
+        )
+        self.retry(exc=e, countdown=_retry_countdown(self))
+
+
+@shared_task(bind=True, max_retries=3)
+def process_image_detections_batch(self: Task, satellite_image_ids: list[int]) -> str:
+    """Celery task to run AI detection for several SatelliteImages at once.
+
+    All images go to the AI microservice in one inference request and their
+    detections are stored with one INSERT, amortizing the per-request cost.
+    """
+    try:
+        images = SatelliteImage.objects.filter(id__in=satellite_image_ids)
+        if self.request.retries:
+            # Images an earlier attempt already committed are not re-inferred
+            images = images.exclude(status="PROCESSED")
+        satellite_images = list(images.only("id", "site").order_by("id"))
+        if not satellite_images:
+            return "No images to process."
+        logger.info(
+            "Processing %d SatelliteImages for AI detections.", len(satellite_images)
+        )
+
+        ai_client = _ai_client()
+        raw_results_per_image = ai_client.send_images_for_inference(
+            [_inference_image_url(image.pk) for image in satellite_images]
+        )
+        # Every image is marked PROCESSED below, so a short (or long) response
+        # must not be zipped onto the batch; the retry sends it again
+        if len(raw_results_per_image) != len(satellite_images):
+            raise ValueError(
+                f"AI microservice returned {len(raw_results_per_image)} results "
+                f"for {len(satellite_images)} images."
+            )
+
+        detections = []
+        for satellite_image, raw_detection_results in zip(
+            satellite_images, raw_results_per_image
+        ):
+            detections.extend(
+                _build_detections(ai_client, satellite_image, raw_detection_results)
+            )
+
+        processed_ids = [image.pk for image in satellite_images]
+        with transaction.atomic():
+            # Replaces detections of an earlier run, as process_image_detections
+            Detection.objects.filter(satellite_image_id__in=processed_ids).delete()
+            Detection.objects.bulk_create(
+                detections, batch_size=_BULK_CREATE_BATCH_SIZE
+            )
+            SatelliteImage.objects.filter(id__in=processed_ids).update(
+                status="PROCESSED"
+            )
+        cache.delete_many(
+            [detections_geojson_cache_key(image_id) for image_id in processed_ids]
+        )
+
+        logger.info(
+            "Successfully processed %d SatelliteImages and created %d detections. "
+            "Triggering change detection.",
+            len(processed_ids),
+            len(detections),
+        )
+        for site_id in {image.site_id for image in satellite_images}:
+            _schedule_change_detection(site_id)
+
+        return f"Processed {len(processed_ids)} images: {len(detections)} detections."
+
+    except AIServiceUnavailable as e:
+        logger.warning("%s Retrying images %s later.", e, satellite_image_ids)
+        self.retry(
+            exc=e,
+            countdown=e.retry_after + random.uniform(0, _BREAKER_RETRY_JITTER),
+        )
+
     except Exception as e:
-        print(
-            f"An unexpected error occurred processing image {satellite_image_id}: {e}"
+        logger.exception(
+            "An unexpected error occurred processing images %s", satellite_image_ids
         )
-        self.retry(exc=e)
+        self.retry(exc=e, countdown=_retry_countdown(self))
 
 
 # --- Change Detection Logic (Unified and Corrected) ---
-@shared_task(bind=True, max_retries=3, default_retry_delay=300)
-def detect_site_changes(self: Task, site_id: int, processed_image_id: int) -> str:
+@shared_task(bind=True, max_retries=3)
+def detect_site_changes(
+    self: Task, site_id: int, processed_image_id: Optional[int] = None
+) -> str:
     """Celery task to detect changes on a site.
 
-    Compares detections between the newly processed image and a previous image.
+    Compares detections between the newly processed image (by default the
+    site's latest processed one) and a previous image.
     This is a simplified/mocked change detection.
     """
     try:
-        site = get_object_or_404(Site, id=site_id)
+        # Images processed from here on schedule a new run
+        cache.delete(_change_detection_pending_key(site_id))
         # Ensure processed_image is fetched directly for this task,
         # in case the task chain order changes or the image wasn't fully saved yet.
-        processed_image = get_object_or_404(
-            SatelliteImage, id=processed_image_id, site=site
+        # The site comes from the same row.
+        images = SatelliteImage.objects.select_related("site").defer(
+            "site__boundary", "site__metadata"
         )
+        if processed_image_id is None:
+            processed_image = (
+                images.filter(site_id=site_id, status="PROCESSED")
+                .order_by("-date_captured")
+                .first()
+            )
+            if processed_image is None:
+                return (
+                    f"No processed image for site {site_id}. Change detection skipped."
+                )
+        else:
+            processed_image = images.get(id=processed_image_id, site_id=site_id)
+        site = processed_image.site
 
-        print(
-            f"Detecting changes for Site: {site.name} ({site.id}) "
-            f"using image {processed_image.pk}."
+        logger.info(
+            "Detecting changes for Site: %s (%s) using image %s.",
+            site.name,
+            site.id,
+            processed_image.pk,
         )
 
         # Find the most recent *processed* image captured *before* the current one.
@@ -129,6 +330,7 @@ def detect_site_changes(self: Task, site_id: int, processed_image_id: int) -> st
                 date_captured__lt=processed_image.date_captured,  # Images captured before
             )
             .exclude(pk=processed_image.pk)
+            .only("id", "date_captured")
             .order_by("-date_captured")
             .first()
         )
@@ -136,23 +338,36 @@ def detect_site_changes(self: Task, site_id: int, processed_image_id: int) -> st
         if not previous_image:
             # If this is the first processed image for the site,
             # log it but no comparison possible.
-            print(
-                f"No previous processed image found for site {site.name}. "
-                "No comparison made."
+            logger.info(
+                "No previous processed image found for site %s. No comparison made.",
+                site.name,
             )
             # Optionally create a "SITE_INITIALIZED" ChangeLog here.
             return f"No previous image for site {site.name}. Change detection skipped."
 
-        print(
-            f"Comparing Image: {previous_image.pk} (Captured: "
-            f"{previous_image.date_captured.date()}) "
-            f"with Image: {processed_image.pk} (Captured: "
-            f"{processed_image.date_captured.date()})"
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Comparing Image: %s (Captured: %s) with Image: %s (Captured: %s)",
+                previous_image.pk,
+                previous_image.date_captured.date(),
+                processed_image.pk,
+                processed_image.date_captured.date(),
+            )
 
         # --- SIMPLIFIED MOCK CHANGE DETECTION LOGIC ---
-        current_detections_count = processed_image.detections.count()
-        previous_detections_count = previous_image.detections.count()
+        # Per-class detection counts of both images in one GROUP BY query
+        class_counts = {processed_image.pk: Counter(), previous_image.pk: Counter()}
+        for image_id, detected_class, count in (
+            Detection.objects.filter(satellite_image_id__in=class_counts)
+            .order_by()
+            .values_list("satellite_image_id", "detected_class")
+            .annotate(count=Count("id"))
+        ):
+            class_counts[image_id][detected_class] = count
+        current_class_counts = class_counts[processed_image.pk]
+        previous_class_counts = class_counts[previous_image.pk]
+        current_detections_count = current_class_counts.total()
+        previous_detections_count = previous_class_counts.total()
 
         change_type = "NO_CHANGE"
         description = (
@@ -163,7 +378,11 @@ def detect_site_changes(self: Task, site_id: int, processed_image_id: int) -> st
             "image_after_id": processed_image.pk,
             "detections_before_count": previous_detections_count,
             "current_detection_count": current_detections_count,
-            "change_details": {},  # Placeholder for more detailed diff
+            # Detections gained and lost per class between the two images
+            "change_details": {
+                "added": dict(current_class_counts - previous_class_counts),
+                "removed": dict(previous_class_counts - current_class_counts),
+            },
         }
 
         if current_detections_count > previous_detections_count:
@@ -187,11 +406,13 @@ def detect_site_changes(self: Task, site_id: int, processed_image_id: int) -> st
         elif current_detections_count == 0 and previous_detections_count == 0:
             change_type = "NO_CHANGE"
             description = "No detections found in either image."
-        # Optionally, add a random chance for "SITE_ACTIVITY_HIGH" to show varying results
-        if random.random() < 0.2:  # 20% chance
+        # Optionally, add a random chance for "SITE_ACTIVITY_HIGH" to show varying results.
+        # One draw decides both, so the chances are exactly 20% and 10%.
+        activity_draw = random.random()
+        if activity_draw < 0.2:  # 20% chance
             change_type = "SITE_ACTIVITY_HIGH"
             description = "Mock: High site activity detected (random)."
-        elif random.random() < 0.1:  # 10% chance
+        elif activity_draw < 0.3:  # 10% chance
             change_type = "SITE_ACTIVITY_LOW"
             description = "Mock: Low site activity detected (random)."
 
@@ -205,13 +426,17 @@ def detect_site_changes(self: Task, site_id: int, processed_image_id: int) -> st
                 description=description,
                 metadata=metadata,
             )
-            print(
-                f"Created ChangeLog entry {change_log.pk}: '{description}'. "
-                "Triggering alert generation."
+            logger.info(
+                "Created ChangeLog entry %s: '%s'. Triggering alert generation.",
+                change_log.pk,
+                description,
             )
 
-            # Trigger alert generation task
-            generate_alerts.delay(change_log.pk)
+            # Trigger alert generation once the change log is committed, so the
+            # worker never looks it up before it is visible (or after a rollback)
+            transaction.on_commit(
+                lambda change_log_id=change_log.pk: generate_alerts.delay(change_log_id)
+            )
 
         return (
             f"Change detection completed for site {site.name}. "
@@ -219,17 +444,18 @@ def detect_site_changes(self: Task, site_id: int, processed_image_id: int) -> st
         )
 
     except Site.DoesNotExist:
-        print(f"Error: Site with ID {site_id} does not exist for change detection.")
+        logger.error("Site with ID %s does not exist for change detection.", site_id)
         raise
     except SatelliteImage.DoesNotExist:
-        print(
-            f"Error: Processed SatelliteImage with ID {processed_image_id} does not "
-            f"exist or not linked to site {site_id}."
+        logger.error(
+            "Processed SatelliteImage with ID %s does not exist or not linked to "
+            "site %s.",
+            processed_image_id,
+            site_id,
         )
         raise
     except Exception as e:
-        print(
-            f"An unexpected error occurred during change detection for site "
-            f"{site_id}: {e}"
+        logger.exception(
+            "An unexpected error occurred during change detection for site %s", site_id
         )
-        self.retry(exc=e)
+        self.retry(exc=e, countdown=_retry_countdown(self))
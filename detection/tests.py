@@ -1,5 +1,99 @@
 """test suite for the detection app."""
 
-# from django.test import TestCase
+from typing import Iterator
+from unittest import mock
 
-# Create your tests here.
+import pytest
+import requests
+from django.core.cache import cache, caches
+from django.test import override_settings
+
+from detection.client import (
+    _BREAKER_FAIL_MAX,
+    AIMicroserviceClient,
+    AIServiceUnavailable,
+)
+
+_LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@pytest.fixture
+def ai_client() -> Iterator[AIMicroserviceClient]:
+    """Provide a non-mock AI client whose breaker state lives in LocMem."""
+    with override_settings(CACHES=_LOCMEM_CACHES):
+        cache.clear()
+        client = AIMicroserviceClient(base_url="http://ai.test/inference")
+        client.mock = False
+        yield client
+
+
+@pytest.fixture
+def session() -> Iterator[mock.MagicMock]:
+    """Patch the pooled HTTP session the AI client posts through."""
+    with mock.patch("detection.client.pooled_session") as pooled_session:
+        yield pooled_session.return_value
+
+
+def _fail(client: AIMicroserviceClient, times: int) -> None:
+    """Make the given number of requests that fail with a connection error."""
+    for _ in range(times):
+        with pytest.raises(requests.ConnectionError):
+            client.send_image_for_inference("http://images.test/a.tif")
+
+
+def test_breaker_opens_after_fail_max_failures(
+    ai_client: AIMicroserviceClient, session: mock.MagicMock
+) -> None:
+    """The breaker stays closed below the failure limit and opens on reaching it."""
+    session.post.side_effect = requests.ConnectionError()
+
+    _fail(ai_client, _BREAKER_FAIL_MAX - 1)
+    assert not cache.get(ai_client._breaker_key("open"))
+
+    _fail(ai_client, 1)
+    assert cache.get(ai_client._breaker_key("open"))
+
+
+def test_open_breaker_raises_without_request(
+    ai_client: AIMicroserviceClient, session: mock.MagicMock
+) -> None:
+    """While the breaker is open the service is not called."""
+    session.post.side_effect = requests.ConnectionError()
+    _fail(ai_client, _BREAKER_FAIL_MAX)
+
+    with pytest.raises(AIServiceUnavailable):
+        ai_client.send_image_for_inference("http://images.test/a.tif")
+
+    assert session.post.call_count == _BREAKER_FAIL_MAX
+
+
+def test_success_resets_failure_count(
+    ai_client: AIMicroserviceClient, session: mock.MagicMock
+) -> None:
+    """A successful request clears the failures counted so far."""
+    session.post.side_effect = requests.ConnectionError()
+    _fail(ai_client, _BREAKER_FAIL_MAX - 1)
+
+    session.post.side_effect = None
+    session.post.return_value.json.return_value = []
+    assert ai_client.send_image_for_inference("http://images.test/a.tif") == []
+    assert cache.get(ai_client._breaker_key("failures")) is None
+
+    session.post.side_effect = requests.ConnectionError()
+    _fail(ai_client, _BREAKER_FAIL_MAX - 1)
+    assert not cache.get(ai_client._breaker_key("open"))
+
+
+def test_vanished_failure_counter_restarts_at_one(
+    ai_client: AIMicroserviceClient, session: mock.MagicMock
+) -> None:
+    """A counter that disappears between add() and incr() is restarted."""
+    session.post.side_effect = requests.ConnectionError()
+
+    with mock.patch.object(caches["default"], "incr", side_effect=ValueError):
+        _fail(ai_client, 1)
+
+    assert cache.get(ai_client._breaker_key("failures")) == 1
+    assert not cache.get(ai_client._breaker_key("open"))
@@ -1,6 +1,8 @@
 """Views for the detection app."""
+from django.contrib.gis.db.models.functions import AsGeoJSON
 from django.db.models import QuerySet, Model  # Import Model for type hinting obj
 from rest_framework import permissions, viewsets
+from rest_framework.pagination import CursorPagination
 from rest_framework.request import Request
 from rest_framework.views import APIView
 
@@ -95,14 +97,37 @@ class ChangeLogFilter(FilterSet):
 # --- ViewSets ---
 
 
+class TimestampCursorPagination(CursorPagination):
+    """Cursor pagination over detections or change logs, newest first.
+
+    Pages are fetched with a WHERE on the last seen timestamp (ties on it are
+    skipped with a small offset) rather than a growing OFFSET, and without a
+    COUNT(*), so deep pages of a site with millions of detections stay cheap.
+    id only makes the order stable.
+    """
+
+    ordering = ("-timestamp", "-id")
+
+
 class DetectionViewSet(viewsets.ReadOnlyModelViewSet):
     """API endpoint that allows Detections to be viewed.
 
     Supports filtering.
     """
 
-    # Optimize query: pre-fetch related SatelliteImage and its Site owner
-    queryset = Detection.objects.all().select_related("satellite_image__site")
+    # Optimize query: pre-fetch related SatelliteImage and its Site owner.
+    # The serializer only reads the image id and the site name from the join,
+    # so the joined rows' geometries and JSON metadata are left behind.
+    queryset = (
+        Detection.objects.all()
+        .select_related("satellite_image__site")
+        .defer(
+            "satellite_image__footprint",
+            "satellite_image__metadata",
+            "satellite_image__site__boundary",
+            "satellite_image__site__metadata",
+        )
+    )
     serializer_class = DetectionSerializer
     permission_classes = [
         permissions.IsAuthenticated,
@@ -111,10 +136,18 @@ class DetectionViewSet(viewsets.ReadOnlyModelViewSet):
 
     filter_backends = [DjangoFilterBackend]
     filterset_class = DetectionFilter
+    pagination_class = TimestampCursorPagination
 
     def get_queryset(self: "DetectionViewSet") -> "QuerySet[Detection]":
         """Override to filter Detections by the requesting user's sites."""
-        queryset = super().get_queryset()
+        # DetectionSerializer reads the GeoJSON PostGIS renders for location,
+        # so the geometry column itself is not fetched
+        queryset = (
+            super()
+            .get_queryset()
+            .annotate(location_geojson=AsGeoJSON("location"))
+            .defer("location")
+        )
         # Optional: Filter by site_pk if nested under /sites/<pk>/detections/
         site_pk = self.kwargs.get("site_pk")
         if site_pk:
@@ -128,9 +161,19 @@ class ChangeLogViewSet(viewsets.ReadOnlyModelViewSet):
     Supports filtering by site and date range.
     """
 
-    # Optimize query: pre-fetch related Site, and before/after images
-    queryset = ChangeLog.objects.all().select_related(
-        "site", "image_before", "image_after"
+    # Optimize query: pre-fetch related Site, and before/after images, without
+    # their geometries and JSON metadata (only names and capture dates are shown)
+    queryset = (
+        ChangeLog.objects.all()
+        .select_related("site", "image_before", "image_after")
+        .defer(
+            "site__boundary",
+            "site__metadata",
+            "image_before__footprint",
+            "image_before__metadata",
+            "image_after__footprint",
+            "image_after__metadata",
+        )
     )
     serializer_class = ChangeLogSerializer
     permission_classes = [
@@ -140,6 +183,7 @@ class ChangeLogViewSet(viewsets.ReadOnlyModelViewSet):
 
     filter_backends = [DjangoFilterBackend]
     filterset_class = ChangeLogFilter
+    pagination_class = TimestampCursorPagination
 
     def get_queryset(self: "ChangeLogViewSet") -> "QuerySet[ChangeLog]":
         """Override to filter ChangeLogs by the requesting user's sites."""